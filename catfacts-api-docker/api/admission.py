@@ -0,0 +1,149 @@
+import asyncio
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+
+
+class Overloaded(Exception):
+    """La ruta está saturada: el cliente debe reintentar más tarde (503)"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(Exception):
+    """Se agotó el cupo de llamadas a un servicio externo (429)"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_header(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+class ConcurrencyLimiter:
+    """Límite de peticiones simultáneas de una ruta con cola de espera acotada.
+
+    Hasta `limit` peticiones se atienden a la vez y hasta `queue_size` más
+    esperan turno como mucho `queue_timeout` segundos. El resto se rechaza al
+    instante con Overloaded, antes de ocupar un hilo del threadpool o una
+    conexión del pool, así las rutas baratas siguen respondiendo.
+    Se usa desde el event loop.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float = 2.0):
+        if limit < 1:
+            raise ValueError("limit debe ser >= 1")
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self._active = 0
+        self._waiting = 0
+
+        self._admitted = 0
+        self._rejected_full = 0
+        self._rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self._waiting >= self.queue_size:
+                self._rejected_full += 1
+                raise Overloaded(f"Ruta {self.name} saturada", self.queue_timeout)
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._rejected_timeout += 1
+                raise Overloaded(f"Ruta {self.name} saturada (espera agotada)", self.queue_timeout)
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self._active += 1
+        self._admitted += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limite": self.limit,
+            "cola_max": self.queue_size,
+            "activas": self._active,
+            "en_espera": self._waiting,
+            "admitidas": self._admitted,
+            "rechazadas_cola_llena": self._rejected_full,
+            "rechazadas_espera": self._rejected_timeout,
+        }
+
+
+class TokenBucket:
+    """Cubo de fichas para limitar las llamadas a un servicio externo.
+
+    Se reponen `rate` fichas por segundo hasta `burst`. `acquire(n)` reserva
+    n fichas (pueden quedar en negativo, como una deuda) y devuelve los
+    segundos que hay que esperar para respetar el ritmo; si esa espera supera
+    `max_wait`, no reserva nada y lanza RateLimited. Es seguro entre hilos.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, max_wait: float = 1.0):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate debe ser > 0 y burst >= 1")
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._granted = 0
+        self._waited = 0
+        self._rejected = 0
+
+    def acquire(self, tokens: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Se espera lo que falte para tener las fichas pedidas
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if wait > self.max_wait:
+                self._rejected += 1
+                raise RateLimited(f"Cupo de llamadas a {self.name} agotado", wait)
+            self._tokens -= tokens
+            self._granted += 1
+            if wait > 0:
+                self._waited += 1
+            return wait
+
+    def wait(self, tokens: float = 1):
+        """Versión bloqueante para hilos"""
+        delay = self.acquire(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, tokens: float = 1):
+        delay = self.acquire(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "fichas_por_segundo": self.rate,
+                "rafaga": self.burst,
+                "fichas": round(min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate), 2),
+                "concedidas": self._granted,
+                "con_espera": self._waited,
+                "rechazadas": self._rejected,
+            }
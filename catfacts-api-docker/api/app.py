@@ -1,16 +1,52 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import requests
-import pyodbc
 import os
+import hmac
+import time
+import base64
+import csv
+import asyncio
+import inspect
+import io
+import json
+import threading
 from dotenv import load_dotenv
 from deep_translator import GoogleTranslator
-from typing import Optional
+from typing import List, Optional, Tuple
+from contextlib import asynccontextmanager
+from db_pool import ConnectionPool, PoolTimeout
+from repository import (
+    BACKENDS, DuplicateFact, LIST_COLUMNS, TRANSLATION_COMPLETED, TRANSLATION_FAILED, TRANSLATION_PENDING,
+    content_hash, sqlite_connect, sqlserver_connect,
+)
+from translation_cache import PartialTranslation, TranslationCache, SqlTranslationStore
+from translation_worker import TranslationWorker
+from prefetch import FactPrefetcher
+from fact_cache import FactCache
+from jobs import Job, JobRegistry
+from write_buffer import BufferFull, InsertBuffer
+from change_feed import ChangeFeed, INSERTED, UPDATED, DELETED, CLEARED
+from search_index import CorpusStats, SearchIndex, LANGUAGES
+from random_sampler import RandomIdSampler
+from static_assets import build_static_bundle, PrecompressedStaticFiles
+from fast_json import FastJSONResponse
+from compression import CompressionMiddleware
+import profiling
+from profiling import ProfileStore, RequestTrace, SamplingProfiler, SlowLog
+from metrics import timed, timed_connect, COALESCED, ERRORS, REQUESTS, REQUEST_LATENCY
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from admission import ConcurrencyLimiter, Overloaded, RateLimited, TokenBucket, retry_after_header
+from http_cache import row_etag, list_etag, etag_matches, if_match_versions, cache_control
+from upstream import CatFactsClient, CircuitBreaker, UpstreamUnavailable
 
 load_dotenv()
-app = FastAPI(title="😺 API CRUD de Hechos de Gatos en Español")
+
+# Motor de almacenamiento: sqlserver (por defecto) o sqlite
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlserver").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "catfacts.db")
 
 # Conexión a SQL Server
 conn_str = (
@@ -24,6 +60,434 @@ conn_str = (
 
 CATFACTS_URL = "https://catfact.ninja/fact"
 
+# Origen por defecto de GET /api/hecho: upstream (catfact.ninja) o local (hechos guardados)
+RANDOM_SOURCE = os.getenv("RANDOM_SOURCE", "upstream").lower()
+RANDOM_SOURCES = ("upstream", "local")
+
+# Máximo de filas por página en GET /api/hechos
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "500"))
+
+# Proyección de GET /api/hechos (?fields=): campo de la respuesta -> columna
+LIST_FIELDS = {"id": "id", "hecho_en": "fact_en", "hecho_es": "fact_es"}
+
+# Compresión de respuestas (zstd/gzip) a partir de COMPRESSION_MIN_SIZE bytes
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Diagnóstico: perfilado por petición (cabecera X-Profile-Token) y log de llamadas lentas
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+SLOW_LOG_ENABLED = os.getenv("SLOW_LOG_ENABLED", "false").lower() == "true"
+if PROFILING_ENABLED and not PROFILING_TOKEN:
+    raise RuntimeError("PROFILING_ENABLED requiere PROFILING_TOKEN")
+
+# max-age de Cache-Control en lecturas con ETag (0 = revalidar siempre)
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+# Carga masiva: filas por lote (SQL Server admite 2100 parámetros por sentencia, 4 por fila)
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_MAX_CHUNK_SIZE = 500
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+FACT_MAX_LENGTH = 255
+
+# Exportación: filas leídas del servidor en cada fetchmany
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Borrado masivo en segundo plano: filas por transacción y pausa entre lotes (s)
+MASS_DELETE_CHUNK_SIZE = int(os.getenv("MASS_DELETE_CHUNK_SIZE", "4000"))
+MASS_DELETE_PAUSE = float(os.getenv("MASS_DELETE_PAUSE", "0.05"))
+
+# Búsqueda: resultados máximos por página
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "5000"))
+
+# Control de admisión: peticiones simultáneas y en cola de las rutas caras.
+# La suma de límites debe quedar por debajo de los 40 hilos del threadpool
+# para que las lecturas baratas (GET /api/hechos/{id}) siempre tengan hilo.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+ADMISSION_DEFAULTS = {
+    "aleatorio": (8, 16),
+    "alta": (8, 32),
+    "carga_masiva": (2, 2),
+    "exportacion": (2, 2),
+}
+
+# Ritmo máximo de llamadas salientes (por segundo) y espera máxima por una ficha (s)
+CATFACTS_RATE = float(os.getenv("CATFACTS_RATE", "10"))
+CATFACTS_BURST = float(os.getenv("CATFACTS_BURST", "20"))
+TRANSLATOR_RATE = float(os.getenv("TRANSLATOR_RATE", "20"))
+TRANSLATOR_BURST = float(os.getenv("TRANSLATOR_BURST", "40"))
+OUTBOUND_MAX_WAIT = float(os.getenv("OUTBOUND_MAX_WAIT", "1"))
+
+# Pool de conexiones compartido por todos los endpoints
+if DB_BACKEND not in BACKENDS:
+    raise RuntimeError(f"DB_BACKEND desconocido: {DB_BACKEND} (usa {', '.join(BACKENDS)})")
+connect = sqlite_connect(SQLITE_PATH) if DB_BACKEND == "sqlite" else sqlserver_connect(conn_str)
+db_pool = ConnectionPool(
+    timed_connect(connect),
+    min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+    max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+    timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    recycle=float(os.getenv("DB_POOL_RECYCLE", "1800")),
+    ping_after=float(os.getenv("DB_POOL_PING_AFTER", "30")),
+)
+repository = BACKENDS[DB_BACKEND](db_pool)
+
+# Escritura diferida opcional: las altas se agrupan en transacciones multi-fila
+insert_buffer = None
+if os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true":
+    insert_buffer = InsertBuffer(
+        db_pool,
+        repository,
+        batch_size=max(1, min(int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100")), BULK_MAX_CHUNK_SIZE)),
+        max_delay=float(os.getenv("WRITE_BEHIND_MAX_DELAY", "0.005")),
+        max_queue=int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000")),
+    )
+
+# Caché read-through de hechos por id (se invalida en cada escritura)
+fact_cache = FactCache(
+    max_size=int(os.getenv("FACT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("FACT_CACHE_TTL", "60")),
+    on_coalesced=COALESCED.labels("fact_read").inc,
+)
+
+# Índice invertido de búsqueda (se carga en segundo plano al arrancar)
+search_index = SearchIndex(max_candidates=SEARCH_MAX_CANDIDATES) if os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true" else None
+
+def load_search_batches():
+    with db_pool.connection() as conn:
+        yield from repository.iter_since(conn, 0, EXPORT_BATCH_SIZE)
+
+# Ids guardados para servir hechos aleatorios locales en O(1)
+random_sampler = RandomIdSampler() if os.getenv("LOCAL_RANDOM_ENABLED", "true").lower() == "true" else None
+
+def load_id_batches():
+    with db_pool.connection() as conn:
+        yield from repository.iter_ids(conn, EXPORT_BATCH_SIZE)
+
+# Difusión en vivo de los cambios (SSE) a la interfaz web
+change_feed = ChangeFeed(
+    history=int(os.getenv("CHANGE_FEED_HISTORY", "1000")),
+    max_subscribers=int(os.getenv("CHANGE_FEED_MAX_SUBSCRIBERS", "1000")),
+    heartbeat=float(os.getenv("CHANGE_FEED_HEARTBEAT", "15")),
+)
+
+def publish_facts(kind: str, rows: list):
+    """Publica [(id, fact_en, fact_es, translation_status), ...] como alta o edición"""
+    if rows:
+        change_feed.publish(kind, {"hechos": [
+            {"id": r[0], "hecho_en": r[1], "hecho_es": r[2], "translation_status": r[3]} for r in rows
+        ]})
+
+def publish_deleted(fact_ids: List[int]):
+    if fact_ids:
+        change_feed.publish(DELETED, {"ids": list(fact_ids)})
+
+def start_index_build(index, load_batches, name: str):
+    """Lanza la carga de un índice en memoria en un hilo si todavía no está listo"""
+    if index is not None and not index.ready:
+        threading.Thread(target=index.build, args=(load_batches,), name=name, daemon=True).start()
+
+def index_fact(fact_id: int, fact_en: str, fact_es: str):
+    if search_index is not None:
+        search_index.add(fact_id, fact_en, fact_es)
+    if random_sampler is not None:
+        random_sampler.add(fact_id)
+
+def unindex_fact(fact_id: int):
+    if search_index is not None:
+        search_index.remove(fact_id)
+    if random_sampler is not None:
+        random_sampler.remove(fact_id)
+
+def unindex_all():
+    if search_index is not None:
+        search_index.clear()
+    if random_sampler is not None:
+        random_sampler.clear()
+
+# Cupo de llamadas al traductor: una ficha por texto (translate_batch hace una petición por texto)
+translator_bucket = TokenBucket("traductor", TRANSLATOR_RATE, TRANSLATOR_BURST, max_wait=OUTBOUND_MAX_WAIT)
+
+def google_translate(text: str, source: str, target: str) -> str:
+    translator_bucket.wait()
+    with timed("translation", lambda: {"textos": 1, "caracteres": len(text)}):
+        return GoogleTranslator(source=source, target=target).translate(text)
+
+def google_translate_batch(texts: List[str], source: str, target: str) -> List[str]:
+    """Texto a texto, como GoogleTranslator.translate_batch, pero con una ficha
+    por texto; si se corta a mitad (p. ej. sin cupo) se conserva lo ya traducido"""
+    translated = []
+    for text in texts:
+        try:
+            translated.append(google_translate(text, source, target))
+        except Exception as e:
+            raise PartialTranslation(translated, e)
+    return translated
+
+# Caché de traducciones (memoria LRU + tabla TranslationCache)
+translation_cache = TranslationCache(
+    google_translate,
+    max_size=int(os.getenv("TRANSLATION_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TRANSLATION_CACHE_TTL", "86400")),
+    store=SqlTranslationStore(db_pool, repository.hash_param) if os.getenv("TRANSLATION_CACHE_PERSIST", "true").lower() == "true" else None,
+    translate_batch=google_translate_batch,
+    on_coalesced=COALESCED.labels("translation").inc,
+)
+
+def translate_to_spanish(text: str) -> str:
+    return translation_cache.translate(text, "en", "es")
+
+# Traducción de altas y ediciones: sync (en la petición) o deferred (en segundo plano)
+TRANSLATION_MODE = os.getenv("TRANSLATION_MODE", "sync").lower()
+if TRANSLATION_MODE not in ("sync", "deferred"):
+    raise RuntimeError(f"TRANSLATION_MODE desconocido: {TRANSLATION_MODE} (usa sync o deferred)")
+
+def on_translated(rows: list):
+    """Las filas traducidas en segundo plano dejan de estar en caché con fact_es vacío"""
+    for fact_id, fact_en, fact_es in rows:
+        fact_cache.invalidate(fact_id)
+        index_fact(fact_id, fact_en, fact_es)
+    publish_facts(UPDATED, [(*row, TRANSLATION_COMPLETED) for row in rows])
+
+def on_translation_failed(rows: list):
+    """Los hechos que agotaron sus intentos dejan de mostrarse como pendientes"""
+    for fact_id, _, _ in rows:
+        fact_cache.invalidate(fact_id)
+    publish_facts(UPDATED, [(*row, TRANSLATION_FAILED) for row in rows])
+
+translation_worker = None
+if TRANSLATION_MODE == "deferred":
+    translation_worker = TranslationWorker(
+        db_pool,
+        repository,
+        translate_many=lambda texts: translation_cache.translate_many(texts, "en", "es"),
+        translate_one=translate_to_spanish,
+        on_translated=on_translated,
+        on_failed=on_translation_failed,
+        workers=int(os.getenv("TRANSLATION_WORKERS", "2")),
+        batch_size=int(os.getenv("TRANSLATION_BATCH_SIZE", "50")),
+        poll_interval=float(os.getenv("TRANSLATION_POLL_INTERVAL", "5")),
+        lease=float(os.getenv("TRANSLATION_LEASE", "60")),
+        max_attempts=int(os.getenv("TRANSLATION_MAX_ATTEMPTS", "5")),
+        backoff=float(os.getenv("TRANSLATION_BACKOFF", "10")),
+    )
+
+def translation_queued(status: Optional[str]):
+    """Despierta al traductor en segundo plano si quedó trabajo pendiente"""
+    if translation_worker and status == TRANSLATION_PENDING:
+        translation_worker.notify()
+
+# Cliente HTTP asíncrono compartido (keep-alive, timeouts, reintentos, circuit breaker)
+catfacts_client = CatFactsClient(
+    CATFACTS_URL,
+    connect_timeout=float(os.getenv("CATFACTS_CONNECT_TIMEOUT", "3")),
+    read_timeout=float(os.getenv("CATFACTS_READ_TIMEOUT", "5")),
+    retries=int(os.getenv("CATFACTS_RETRIES", "2")),
+    backoff=float(os.getenv("CATFACTS_BACKOFF", "0.2")),
+    max_connections=int(os.getenv("CATFACTS_MAX_CONNECTIONS", "20")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("CATFACTS_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("CATFACTS_BREAKER_RESET", "30")),
+    ),
+    rate_limiter=TokenBucket("Cat Facts API", CATFACTS_RATE, CATFACTS_BURST, max_wait=OUTBOUND_MAX_WAIT),
+)
+
+def find_stored_fact(fact_en: str):
+    """(id, fact_en, fact_es) si ese contenido ya está guardado, si no None"""
+    with db_pool.connection() as conn:
+        return repository.find_by_hash(conn, content_hash(fact_en))
+
+async def fetch_translated_fact():
+    """Obtiene un hecho de la Cat Facts API y lo traduce: (fact_en, fact_es)"""
+    with timed("upstream_fetch", {"url": CATFACTS_URL}):
+        fact_english = await catfacts_client.fetch_fact()
+    # Si el hecho ya está guardado se reutiliza su traducción
+    try:
+        stored = await run_in_threadpool(profiling.traced(find_stored_fact), fact_english)
+    except Exception:
+        stored = None
+    if stored and stored[2] is not None:
+        return fact_english, stored[2]
+    fact_spanish = await run_in_threadpool(profiling.traced(translate_to_spanish), fact_english)
+    return fact_english, fact_spanish
+
+# Precarga opcional de hechos aleatorios en segundo plano
+prefetcher = None
+if os.getenv("PREFETCH_ENABLED", "false").lower() == "true":
+    prefetcher = FactPrefetcher(
+        fetch_translated_fact,
+        max_size=int(os.getenv("PREFETCH_QUEUE_SIZE", "50")),
+        low_watermark=int(os.getenv("PREFETCH_LOW_WATERMARK", "10")),
+        high_watermark=int(os.getenv("PREFETCH_HIGH_WATERMARK", "40")),
+        refill_rate=float(os.getenv("PREFETCH_REFILL_RATE", "2")),
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        db_pool.open()
+    except Exception as e:
+        # La API arranca igual; las conexiones se abrirán bajo demanda
+        print(f"No se pudo precalentar el pool de conexiones: {e}")
+    await catfacts_client.start()
+    if insert_buffer:
+        insert_buffer.start()
+    if prefetcher:
+        prefetcher.start()
+    if translation_worker:
+        translation_worker.start()
+    start_index_build(search_index, load_search_batches, "search-index")
+    start_index_build(random_sampler, load_id_batches, "random-sampler")
+    yield
+    change_feed.close()
+    if translation_worker:
+        await translation_worker.stop()
+    if prefetcher:
+        await prefetcher.stop()
+    if insert_buffer:
+        # Se confirman las altas que quedan en cola antes de cerrar el pool
+        await run_in_threadpool(insert_buffer.stop)
+    await catfacts_client.close()
+    db_pool.close()
+
+app = FastAPI(
+    title="😺 API CRUD de Hechos de Gatos en Español",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+class ProfiledRoute(APIRoute):
+    """Ruta cuyo endpoint síncrono se perfila entero en su hilo del threadpool"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = profiling.traced(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+if PROFILING_ENABLED:
+    # Antes de declarar las rutas
+    app.router.route_class = ProfiledRoute
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    """Cuenta peticiones y mide su latencia por plantilla de ruta"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    except Exception as e:
+        ERRORS.labels("request", type(e).__name__).inc()
+        raise
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "sin_ruta")
+        REQUESTS.labels(request.method, route_path, str(status)).inc()
+        REQUEST_LATENCY.labels(request.method, route_path).observe(time.perf_counter() - start)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        zstd_level=int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+    )
+
+# Perfiles capturados y log de lentas (sin coste por petición si están desactivados)
+profiles = ProfileStore(max_profiles=int(os.getenv("PROFILING_MAX_STORED", "20")))
+if SLOW_LOG_ENABLED:
+    profiling.slow_log = SlowLog(
+        threshold=float(os.getenv("SLOW_LOG_THRESHOLD_MS", "200")) / 1000,
+        max_entries=int(os.getenv("SLOW_LOG_MAX_ENTRIES", "500")),
+    )
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+async def trace_request(request: Request, call_next):
+    """Anota la ruta para el log de lentas y, con X-Profile-Token, perfila la petición"""
+    profiler = None
+    if PROFILING_ENABLED and profiling_authorized(request.headers.get("x-profile-token")):
+        profiler = SamplingProfiler(interval=PROFILING_INTERVAL)
+        # Hilo del event loop; los del threadpool se añaden mientras ejecutan la petición
+        profiler.attach_loop(asyncio.get_running_loop())
+        profiler.start()
+    trace = RequestTrace(request.method, request.url.path, sorted(request.query_params.keys()), profiler)
+    token = profiling.begin_trace(trace)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        profiling.end_trace(token)
+        if profiler is not None:
+            report = profiler.stop()
+            profile_id = profiles.add({
+                "ruta": f"{request.method} {request.url.path}",
+                "estado": status,
+                "creado": time.time(),
+                **report,
+            })
+    if profiler is not None:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
+if PROFILING_ENABLED or SLOW_LOG_ENABLED:
+    app.middleware("http")(trace_request)
+
+def pool_busy(e: PoolTimeout) -> HTTPException:
+    """503 cuando no queda ninguna conexión libre en el plazo DB_POOL_TIMEOUT"""
+    return HTTPException(status_code=503, detail=f"Base de datos ocupada: {str(e)}", headers={"Retry-After": "1"})
+
+def get_db():
+    """Dependencia FastAPI: presta una conexión del pool durante la petición"""
+    try:
+        item = db_pool.acquire()
+    except PoolTimeout as e:
+        raise pool_busy(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error de conexión: {str(e)}")
+    try:
+        yield item.conn
+    finally:
+        db_pool.release(item)
+
+# Límites por ruta (ADMISSION_<RUTA>_LIMIT / ADMISSION_<RUTA>_QUEUE)
+route_limiters = {
+    name: ConcurrencyLimiter(
+        name,
+        limit=int(os.getenv(f"ADMISSION_{name.upper()}_LIMIT", str(limit))),
+        queue_size=int(os.getenv(f"ADMISSION_{name.upper()}_QUEUE", str(queue_size))),
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    )
+    for name, (limit, queue_size) in ADMISSION_DEFAULTS.items()
+} if ADMISSION_ENABLED else {}
+
+def admit(name: str):
+    """Dependencia FastAPI: reserva un hueco de la ruta o responde 503 al instante.
+
+    Se resuelve en el event loop, antes de que el endpoint ocupe un hilo o
+    una conexión del pool, y el hueco se libera al terminar la respuesta.
+    """
+    async def dependency():
+        limiter = route_limiters.get(name)
+        if limiter is None:
+            yield
+            return
+        try:
+            async with limiter.slot():
+                yield
+        except Overloaded as e:
+            raise HTTPException(status_code=503, detail=f"Error: {str(e)}", headers=retry_after_header(e.retry_after))
+    return dependency
+
+def rate_limited(e: RateLimited) -> HTTPException:
+    return HTTPException(status_code=429, detail=f"Error: {str(e)}", headers=retry_after_header(e.retry_after))
+
 # Modelos Pydantic
 class CatFactCreate(BaseModel):
     fact_en: str
@@ -36,698 +500,787 @@ class CatFactUpdate(BaseModel):
 class CatFactResponse(BaseModel):
     id: int
     fact_en: str
-    fact_es: str
+    fact_es: Optional[str] = None
+    translation_status: str = TRANSLATION_COMPLETED
+
+def stored_status(fact_es: Optional[str]) -> str:
+    return TRANSLATION_COMPLETED if fact_es is not None else TRANSLATION_PENDING
 
 # ==================== INTERFAZ WEB ====================
 
-@app.get("/", response_class=HTMLResponse)
-def home():
+# La interfaz vive en static/ y se publica precomprimida con nombres con hash
+STATIC_SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_BUILD_DIR = os.getenv(
+    "STATIC_BUILD_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "static_build"),
+)
+build_static_bundle(STATIC_SOURCE_DIR, STATIC_BUILD_DIR)
+static_files = PrecompressedStaticFiles(directory=STATIC_BUILD_DIR)
+app.mount("/static", static_files, name="static")
+
+@app.get("/", include_in_schema=False)
+async def home(request: Request):
     """Interfaz web principal"""
-    return """
-    <!DOCTYPE html>
-    <html lang="es">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>🐱 CRUD Hechos de Gatos</title>
-        <style>
-    * {
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-    }
-    
-    body {
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        background: linear-gradient(135deg, #0f2027 0%, #203a43 50%, #2c5364 100%);
-        min-height: 100vh;
-        padding: 20px;
-    }
-    
-    .container {
-        max-width: 1200px;
-        margin: 0 auto;
-        background: white;
-        border-radius: 20px;
-        padding: 30px;
-        box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-    }
-    
-    h1 {
-        text-align: center;
-        color: #3182ce; /* azul */
-        margin-bottom: 10px;
-        font-size: 2.5em;
-    }
-    
-    .subtitle {
-        text-align: center;
-        color: #666;
-        margin-bottom: 30px;
-    }
-    
-    .actions {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-        gap: 15px;
-        margin-bottom: 30px;
-    }
-    
-    .btn {
-        padding: 15px 25px;
-        border: none;
-        border-radius: 10px;
-        font-size: 16px;
-        font-weight: bold;
-        cursor: pointer;
-        transition: all 0.3s;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 10px;
-    }
-    
-    .btn:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-    }
-    
-    .btn-primary {
-        background: #3182ce; /* azul */
-        color: white;
-    }
-    
-    .btn-success {
-        background: #48bb78;
-        color: white;
-    }
-    
-    .btn-danger {
-        background: #f56565;
-        color: white;
-    }
-    
-    .btn-warning {
-        background: #ed8936;
-        color: white;
-    }
-    
-    .form-section {
-        background: #f7fafc;
-        padding: 20px;
-        border-radius: 10px;
-        margin-bottom: 20px;
-        display: none;
-    }
-    
-    .form-section.active {
-        display: block;
-    }
-    
-    .form-group {
-        margin-bottom: 15px;
-    }
-    
-    label {
-        display: block;
-        margin-bottom: 5px;
-        color: #2d3748;
-        font-weight: 600;
-    }
-    
-    input, textarea {
-        width: 100%;
-        padding: 12px;
-        border: 2px solid #e2e8f0;
-        border-radius: 8px;
-        font-size: 14px;
-        transition: border-color 0.3s;
-    }
-    
-    input:focus, textarea:focus {
-        outline: none;
-        border-color: #3182ce; /* azul */
-    }
-    
-    textarea {
-        resize: vertical;
-        min-height: 80px;
-    }
-    
-    .facts-list {
-        margin-top: 30px;
-    }
-    
-    .fact-card {
-        background: #f7fafc;
-        padding: 20px;
-        border-radius: 10px;
-        margin-bottom: 15px;
-        border-left: 5px solid #3182ce; /* azul */
-        position: relative;
-    }
-    
-    .fact-card:hover {
-        background: #edf2f7;
-    }
-    
-    .fact-id {
-        position: absolute;
-        top: 10px;
-        right: 10px;
-        background: #3182ce; /* azul */
-        color: white;
-        padding: 5px 10px;
-        border-radius: 20px;
-        font-size: 12px;
-        font-weight: bold;
-    }
-    
-    .fact-content {
-        margin-bottom: 10px;
-    }
-    
-    .fact-en {
-        color: #2d3748;
-        font-weight: 600;
-        margin-bottom: 5px;
-    }
-    
-    .fact-es {
-        color: #4a5568;
-    }
-    
-    .fact-actions {
-        display: flex;
-        gap: 10px;
-        margin-top: 15px;
-    }
-    
-    .btn-small {
-        padding: 8px 15px;
-        font-size: 14px;
-    }
-    
-    .message {
-        padding: 15px;
-        border-radius: 8px;
-        margin-bottom: 20px;
-        display: none;
-    }
-    
-    .message.success {
-        background: #c6f6d5;
-        color: #22543d;
-        border-left: 4px solid #48bb78;
-    }
-    
-    .message.error {
-        background: #fed7d7;
-        color: #742a2a;
-        border-left: 4px solid #f56565;
-    }
-    
-    .message.active {
-        display: block;
-    }
-    
-    .loading {
-        text-align: center;
-        padding: 20px;
-        color: #3182ce; /* azul */
-        font-weight: bold;
-    }
-    
-    .empty-state {
-        text-align: center;
-        padding: 40px;
-        color: #a0aec0;
-    }
-    
-    .empty-state-icon {
-        font-size: 60px;
-        margin-bottom: 20px;
-    }
-</style>
-
-    </head>
-    <body>
-        <div class="container">
-            <h1>🐱 CRUD Hechos de Gatos</h1>
-            <p class="subtitle">Gestiona hechos curiosos sobre gatos en inglés y español</p>
-            
-            <div id="message" class="message"></div>
-            
-            <div class="actions">
-                <button class="btn btn-primary" onclick="loadFacts()">
-                    Ver Todos los Hechos
-                </button>
-                <button class="btn btn-success" onclick="getRandomFact()">
-                    Obtener Hecho Aleatorio
-                </button>
-                <button class="btn btn-warning" onclick="toggleForm('createForm')">
-                    Crear Hecho Manual
-                </button>
-                <button class="btn btn-danger" onclick="confirmDeleteAll()">
-                    Eliminar Todos
-                </button>
-            </div>
-            
-            <!-- Formulario de Crear -->
-            <div id="createForm" class="form-section">
-                <h3>Crear Nuevo Hecho</h3>
-                <div class="form-group">
-                    <label>Hecho en Inglés *</label>
-                    <textarea id="create_fact_en" placeholder="Escribe el hecho en inglés..."></textarea>
-                </div>
-                <div class="form-group">
-                    <label>Hecho en Español (opcional - se traduce automáticamente)</label>
-                    <textarea id="create_fact_es" placeholder="Traducción al español (opcional)..."></textarea>
-                </div>
-                <button class="btn btn-success" onclick="createFact()">Guardar Hecho</button>
-                <button class="btn btn-danger btn-small" onclick="toggleForm('createForm')">Cancelar</button>
-            </div>
-            
-            <!-- Formulario de Editar -->
-            <div id="editForm" class="form-section">
-                <h3>Editar Hecho #<span id="edit_id"></span></h3>
-                <div class="form-group">
-                    <label>Hecho en Inglés</label>
-                    <textarea id="edit_fact_en"></textarea>
-                </div>
-                <div class="form-group">
-                    <label>Hecho en Español</label>
-                    <textarea id="edit_fact_es"></textarea>
-                </div>
-                <button class="btn btn-success" onclick="updateFact()">Actualizar Hecho</button>
-                <button class="btn btn-danger btn-small" onclick="toggleForm('editForm')">Cancelar</button>
-            </div>
-            
-            <!-- Lista de Hechos -->
-            <div class="facts-list">
-                <h2>Lista de Hechos</h2>
-                <div id="factsList"></div>
-            </div>
-        </div>
-        
-        <script>
-            let currentEditId = null;
-            
-            // Cargar hechos al iniciar
-            window.onload = function() {
-                loadFacts();
-            };
-            
-            // Mostrar mensaje
-            function showMessage(text, type = 'success') {
-                const msg = document.getElementById('message');
-                msg.textContent = text;
-                msg.className = `message ${type} active`;
-                setTimeout(() => {
-                    msg.className = 'message';
-                }, 5000);
-            }
-            
-            // Toggle formularios
-            function toggleForm(formId) {
-                const form = document.getElementById(formId);
-                form.classList.toggle('active');
-                
-                // Limpiar formularios
-                if (formId === 'createForm') {
-                    document.getElementById('create_fact_en').value = '';
-                    document.getElementById('create_fact_es').value = '';
-                }
-            }
-            
-            // Cargar todos los hechos
-            async function loadFacts() {
-                const list = document.getElementById('factsList');
-                list.innerHTML = '<div class="loading">Cargando hechos...</div>';
-                
-                try {
-                    const response = await fetch('/api/hechos');
-                    const data = await response.json();
-                    
-                    if (data.hechos.length === 0) {
-                        list.innerHTML = `
-                            <div class="empty-state">
-                                <div class="empty-state-icon">😿</div>
-                                <p>No hay hechos guardados aún.</p>
-                                <p>Haz clic en "Obtener Hecho Aleatorio" o "Crear Hecho Manual"</p>
-                            </div>
-                        `;
-                        return;
-                    }
-                    
-                    list.innerHTML = data.hechos.map(fact => `
-                        <div class="fact-card">
-                            <div class="fact-id">ID: ${fact.id}</div>
-                            <div class="fact-content">
-                                <div class="fact-en">🇬🇧 ${fact.hecho_en}</div>
-                                <div class="fact-es">🇪🇸 ${fact.hecho_es}</div>
-                            </div>
-                            <div class="fact-actions">
-                                <button class="btn btn-warning btn-small" onclick="editFact(${fact.id})">
-                                    Editar
-                                </button>
-                                <button class="btn btn-danger btn-small" onclick="deleteFact(${fact.id})">
-                                    Eliminar
-                                </button>
-                            </div>
-                        </div>
-                    `).join('');
-                    
-                    showMessage(`Se cargaron ${data.total} hechos`, 'success');
-                } catch (error) {
-                    list.innerHTML = '<div class="empty-state">Error al cargar los hechos</div>';
-                    showMessage('Error al cargar los hechos', 'error');
-                }
-            }
-            
-            // Obtener hecho aleatorio de API externa
-            async function getRandomFact() {
-                try {
-                    showMessage('Obteniendo hecho aleatorio...', 'success');
-                    const response = await fetch('/api/hecho');
-                    const data = await response.json();
-                    showMessage(`Hecho guardado: "${data.hecho_es}"`, 'success');
-                    loadFacts();
-                } catch (error) {
-                    showMessage('Error al obtener hecho aleatorio', 'error');
-                }
-            }
-            
-            // Crear hecho manual
-            async function createFact() {
-                const fact_en = document.getElementById('create_fact_en').value.trim();
-                const fact_es = document.getElementById('create_fact_es').value.trim();
-                
-                if (!fact_en) {
-                    showMessage('El hecho en inglés es obligatorio', 'error');
-                    return;
-                }
-                
-                try {
-                    const response = await fetch('/api/hechos', {
-                        method: 'POST',
-                        headers: {'Content-Type': 'application/json'},
-                        body: JSON.stringify({
-                            fact_en: fact_en,
-                            fact_es: fact_es || null
-                        })
-                    });
-                    
-                    if (response.ok) {
-                        showMessage('Hecho creado exitosamente', 'success');
-                        toggleForm('createForm');
-                        loadFacts();
-                    } else {
-                        showMessage('Error al crear el hecho', 'error');
-                    }
-                } catch (error) {
-                    showMessage('Error de conexión', 'error');
-                }
-            }
-            
-            // Editar hecho
-            async function editFact(id) {
-                try {
-                    const response = await fetch(`/api/hechos/${id}`);
-                    const fact = await response.json();
-                    
-                    currentEditId = id;
-                    document.getElementById('edit_id').textContent = id;
-                    document.getElementById('edit_fact_en').value = fact.fact_en;
-                    document.getElementById('edit_fact_es').value = fact.fact_es;
-                    
-                    document.getElementById('editForm').classList.add('active');
-                    document.getElementById('editForm').scrollIntoView({ behavior: 'smooth' });
-                } catch (error) {
-                    showMessage('Error al cargar el hecho', 'error');
-                }
-            }
-            
-            // Actualizar hecho
-            async function updateFact() {
-                const fact_en = document.getElementById('edit_fact_en').value.trim();
-                const fact_es = document.getElementById('edit_fact_es').value.trim();
-                
-                if (!fact_en && !fact_es) {
-                    showMessage('Debes proporcionar al menos un campo', 'error');
-                    return;
-                }
-                
-                try {
-                    const response = await fetch(`/api/hechos/${currentEditId}`, {
-                        method: 'PUT',
-                        headers: {'Content-Type': 'application/json'},
-                        body: JSON.stringify({
-                            fact_en: fact_en || null,
-                            fact_es: fact_es || null
-                        })
-                    });
-                    
-                    if (response.ok) {
-                        showMessage('Hecho actualizado exitosamente', 'success');
-                        toggleForm('editForm');
-                        loadFacts();
-                    } else {
-                        showMessage('Error al actualizar el hecho', 'error');
-                    }
-                } catch (error) {
-                    showMessage('Error de conexión', 'error');
-                }
-            }
-            
-            // Eliminar hecho
-            async function deleteFact(id) {
-                if (!confirm(`¿Estás seguro de eliminar el hecho #${id}?`)) return;
-                
-                try {
-                    const response = await fetch(`/api/hechos/${id}`, {
-                        method: 'DELETE'
-                    });
-                    
-                    if (response.ok) {
-                        showMessage(`Hecho #${id} eliminado`, 'success');
-                        loadFacts();
-                    } else {
-                        showMessage(' Error al eliminar el hecho', 'error');
-                    }
-                } catch (error) {
-                    showMessage('Error de conexión', 'error');
-                }
-            }
-            
-            // Eliminar todos
-            function confirmDeleteAll() {
-                if (confirm('¿Estás seguro de eliminar TODOS los hechos? Esta acción no se puede deshacer.')) {
-                    deleteAll();
-                }
-            }
-            
-            async function deleteAll() {
-                try {
-                    const response = await fetch('/api/hechos', {
-                        method: 'DELETE'
-                    });
-                    
-                    const data = await response.json();
-                    showMessage(`${data.mensaje}`, 'success');
-                    loadFacts();
-                } catch (error) {
-                    showMessage('Error al eliminar los hechos', 'error');
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
+    return await static_files.get_response("index.html", request.scope)
 
 # ==================== API ENDPOINTS ====================
 
-@app.post("/api/hechos", response_model=CatFactResponse, status_code=201)
-def create_cat_fact(cat_fact: CatFactCreate):
-    """Crear un hecho de gato manualmente"""
+def upsert_fact(fact_en: str, fact_es: str):
+    """Inserta un hecho si su contenido no existe: (id, fact_en, fact_es, creado).
+
+    Con escritura diferida espera a que se confirme el lote que lo incluye.
+    """
+    if insert_buffer:
+        result = insert_buffer.submit(fact_en, fact_es).result()
+    else:
+        with db_pool.connection() as conn:
+            result = repository.upsert(conn, fact_en, fact_es)
+    if result[3]:
+        index_fact(*result[:3])
+        publish_facts(INSERTED, [(*result[:3], stored_status(result[2]))])
+    return result
+
+@app.post("/api/hechos", response_model=CatFactResponse, status_code=201, dependencies=[Depends(admit("alta"))])
+def create_cat_fact(cat_fact: CatFactCreate, response: Response):
+    """Crear un hecho de gato manualmente.
+
+    Si ya existe un hecho con el mismo texto se devuelve ese (200) sin traducir
+    ni insertar de nuevo. Con TRANSLATION_MODE=deferred la fila se guarda sin
+    esperar a la traducción (`translation_status` = pending).
+    """
     try:
         fact_en = cat_fact.fact_en
-        fact_es = cat_fact.fact_es
+        fact_es = cat_fact.fact_es or None
         
         if not fact_es:
-            fact_es = GoogleTranslator(source="en", target="es").translate(fact_en)
+            stored = find_stored_fact(fact_en)
+            if stored:
+                response.status_code = 200
+                return CatFactResponse(
+                    id=stored[0], fact_en=stored[1], fact_es=stored[2], translation_status=stored_status(stored[2])
+                )
+            if not translation_worker:
+                fact_es = translate_to_spanish(fact_en)
         
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO CatFacts (fact_en, fact_es) OUTPUT INSERTED.id VALUES (?, ?)",
-                fact_en, fact_es
-            )
-            new_id = cursor.fetchone()[0]
-            conn.commit()
+        new_id, fact_en, fact_es, created = upsert_fact(fact_en, fact_es)
+        if not created:
+            response.status_code = 200
+        status = stored_status(fact_es)
+        translation_queued(status)
         
-        return CatFactResponse(id=new_id, fact_en=fact_en, fact_es=fact_es)
+        return CatFactResponse(id=new_id, fact_en=fact_en, fact_es=fact_es, translation_status=status)
     
+    except RateLimited as e:
+        raise rate_limited(e)
+    except PoolTimeout as e:
+        raise pool_busy(e)
+    except BufferFull as e:
+        raise HTTPException(status_code=503, detail=f"Error: {str(e)}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al crear el hecho: {str(e)}")
 
-@app.get("/api/hecho")
-def get_random_cat_fact():
-    """Obtiene un hecho aleatorio de la Cat Facts API externa"""
-    try:
-        response = requests.get(CATFACTS_URL)
-        response.raise_for_status()
-        data = response.json()
-        fact_english = data["fact"]
-
-        fact_spanish = GoogleTranslator(source="en", target="es").translate(fact_english)
-
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO CatFacts (fact_en, fact_es) OUTPUT INSERTED.id VALUES (?, ?)",
-                fact_english, fact_spanish
+def upsert_facts_bulk(rows: list) -> dict:
+    """Inserta [(indice, fact_en, fact_es), ...] en una sola transacción; devuelve {indice: (id, creado)}"""
+    with db_pool.connection() as conn:
+        ids = repository.upsert_many(conn, rows)
+    created = []
+    for i, fact_en, fact_es in rows:
+        if i in ids and ids[i][1]:
+            index_fact(ids[i][0], fact_en, fact_es)
+            created.append((ids[i][0], fact_en, fact_es, stored_status(fact_es)))
+    publish_facts(INSERTED, created)
+    return ids
+
+def find_stored_facts(texts: List[str]) -> dict:
+    """{hash: (id, fact_en, fact_es)} de los textos que ya están guardados"""
+    with db_pool.connection() as conn:
+        return repository.find_many_by_hash(conn, list({content_hash(text) for text in texts}))
+
+@app.post("/api/hechos/bulk", status_code=201, dependencies=[Depends(admit("carga_masiva"))])
+def create_cat_facts_bulk(cat_facts: List[CatFactCreate], chunk_size: int = BULK_CHUNK_SIZE):
+    """Crear muchos hechos de una vez.
+
+    Los elementos se procesan por lotes de `chunk_size`: las traducciones que
+    faltan se piden en bloque y cada lote se inserta en una sola transacción.
+    Los hechos ya guardados no se traducen ni se duplican (`existente`). Con
+    TRANSLATION_MODE=deferred no se traduce aquí: quedan `pending`.
+    La respuesta trae un resultado por elemento, en el mismo orden.
+    """
+    if len(cat_facts) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ITEMS} hechos por petición")
+    chunk_size = max(1, min(chunk_size, BULK_MAX_CHUNK_SIZE))
+    results = []
+
+    for start in range(0, len(cat_facts), chunk_size):
+        chunk = cat_facts[start:start + chunk_size]
+        chunk_results = {}
+        rows = []
+
+        # 1. Validación por elemento
+        valid = []
+        for i, cat_fact in enumerate(chunk, start):
+            fact_en = (cat_fact.fact_en or "").strip()
+            if not fact_en:
+                chunk_results[i] = {"indice": i, "error": "fact_en es obligatorio"}
+            elif len(fact_en) > FACT_MAX_LENGTH or len(cat_fact.fact_es or "") > FACT_MAX_LENGTH:
+                chunk_results[i] = {"indice": i, "error": f"Máximo {FACT_MAX_LENGTH} caracteres"}
+            else:
+                valid.append((i, fact_en, cat_fact.fact_es))
+
+        # 2. Los ya guardados se devuelven tal cual; los repetidos en el lote, como el primero
+        try:
+            stored = find_stored_facts([fact_en for _, fact_en, _ in valid])
+        except Exception:
+            stored = {}
+        first_by_hash = {}
+        repeats = {}
+        for i, fact_en, _ in valid:
+            fact_hash = content_hash(fact_en)
+            existing = stored.get(fact_hash)
+            if existing:
+                chunk_results[i] = {
+                    "indice": i, "id": existing[0], "fact_en": existing[1], "fact_es": existing[2], "existente": True
+                }
+            elif fact_hash in first_by_hash:
+                repeats[i] = first_by_hash[fact_hash]
+            else:
+                first_by_hash[fact_hash] = i
+        valid = [row for row in valid if row[0] not in chunk_results and row[0] not in repeats]
+
+        # 3. Traducción en bloque de los que no traen fact_es
+        to_translate = [(i, fact_en) for i, fact_en, fact_es in valid if not fact_es and not translation_worker]
+        translated = {}
+        if to_translate:
+            try:
+                texts = translation_cache.translate_many([text for _, text in to_translate], "en", "es")
+                translated = {i: text for (i, _), text in zip(to_translate, texts)}
+            except RateLimited as e:
+                # Sin cupo en el traductor: se guardan los ya traducidos y fallan solo los demás
+                for i, text in to_translate:
+                    cached = translation_cache.cached(text, "en", "es")
+                    if cached is not None:
+                        translated[i] = cached
+                    else:
+                        chunk_results[i] = {"indice": i, "error": f"Error de traducción: {str(e)}"}
+            except Exception:
+                # Si falla el lote, se traduce uno a uno para aislar los errores
+                for i, text in to_translate:
+                    try:
+                        translated[i] = translate_to_spanish(text)
+                    except Exception as e:
+                        chunk_results[i] = {"indice": i, "error": f"Error de traducción: {str(e)}"}
+
+        for i, fact_en, fact_es in valid:
+            if i in chunk_results:
+                continue
+            fact_es = fact_es or translated.get(i)
+            if fact_es and len(fact_es) > FACT_MAX_LENGTH:
+                chunk_results[i] = {"indice": i, "error": f"Traducción de más de {FACT_MAX_LENGTH} caracteres"}
+                continue
+            rows.append((i, fact_en, fact_es))
+
+        # 4. Inserción del lote (los repetidos dentro del lote apuntan a la primera fila)
+        if rows:
+            try:
+                ids = upsert_facts_bulk(rows)
+                for i, fact_en, fact_es in rows:
+                    if i not in ids:
+                        chunk_results[i] = {"indice": i, "error": "El hecho existente se eliminó durante la carga"}
+                        continue
+                    new_id, created = ids[i]
+                    chunk_results[i] = {"indice": i, "id": new_id, "fact_en": fact_en, "fact_es": fact_es}
+                    if not created:
+                        chunk_results[i]["existente"] = True
+                    elif fact_es is None:
+                        chunk_results[i]["translation_status"] = TRANSLATION_PENDING
+            except PoolTimeout as e:
+                # Los lotes anteriores ya están guardados: al reintentar vuelven como `existente`
+                raise pool_busy(e)
+            except Exception as e:
+                for i, _, _ in rows:
+                    chunk_results[i] = {"indice": i, "error": f"Error al guardar el lote: {str(e)}"}
+
+        for i, first in repeats.items():
+            chunk_results[i] = {**chunk_results[first], "indice": i}
+            if "error" not in chunk_results[i]:
+                chunk_results[i]["existente"] = True
+
+        if any(fact_es is None for _, _, fact_es in rows):
+            translation_queued(TRANSLATION_PENDING)
+        results.extend(chunk_results[i] for i in sorted(chunk_results))
+
+    failed = sum(1 for r in results if "error" in r)
+    existing = sum(1 for r in results if r.get("existente"))
+    return JSONResponse(
+        status_code=201 if not failed else 207,
+        content={
+            "total": len(results),
+            "creados": len(results) - failed - existing,
+            "existentes": existing,
+            "fallidos": failed,
+            "resultados": results,
+        },
+    )
+
+def pick_local_fact():
+    """Hecho guardado elegido al azar (uniforme) o None si no hay ninguno"""
+    for _ in range(5):
+        fact_id = random_sampler.choice()
+        if fact_id is None:
+            return None
+        cached = fact_cache.get_or_load(fact_id, load_fact)
+        if cached:
+            return cached[0]
+        # Borrado fuera de esta instancia: se descarta y se vuelve a elegir
+        random_sampler.remove(fact_id)
+    return None
+
+@app.get("/api/hecho", dependencies=[Depends(admit("aleatorio"))])
+async def get_random_cat_fact(source: Optional[str] = None):
+    """Obtiene un hecho aleatorio.
+
+    `source=upstream` lo pide a la Cat Facts API externa y lo guarda;
+    `source=local` elige uno de los ya guardados sin salir a la red. Por
+    defecto se usa RANDOM_SOURCE.
+    """
+    source = (source or RANDOM_SOURCE).lower()
+    if source not in RANDOM_SOURCES:
+        raise HTTPException(status_code=400, detail="Origen no soportado: usa upstream o local")
+    if source == "local":
+        if random_sampler is None:
+            raise HTTPException(status_code=503, detail="Modo local desactivado (LOCAL_RANDOM_ENABLED=false)")
+        if not random_sampler.ready:
+            start_index_build(random_sampler, load_id_batches, "random-sampler")
+            raise HTTPException(
+                status_code=503, detail="Índice de hechos locales en construcción", headers={"Retry-After": "5"}
             )
-            new_id = cursor.fetchone()[0]
-            conn.commit()
+        try:
+            fact = await run_in_threadpool(profiling.traced(pick_local_fact))
+        except PoolTimeout as e:
+            raise pool_busy(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+        if fact is None:
+            raise HTTPException(status_code=404, detail="No hay hechos guardados")
+        return {
+            "id": fact["id"],
+            "hecho_en": fact["fact_en"],
+            "hecho_es": fact["fact_es"],
+            "origen": "local"
+        }
+    try:
+        # Con precarga activa solo queda persistir; si la cola está vacía, camino en vivo
+        item = prefetcher.pop() if prefetcher else None
+        fact_english, fact_spanish = item if item else await fetch_translated_fact()
+
+        new_id, fact_english, stored_spanish, created = await run_in_threadpool(
+            profiling.traced(upsert_fact), fact_english, fact_spanish
+        )
+        fact_spanish = stored_spanish or fact_spanish
 
         return {
             "id": new_id,
             "hecho_en": fact_english,
-            "hecho_es": fact_spanish
+            "hecho_es": fact_spanish,
+            "existente": not created,
+            "origen": "upstream"
         }
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Error: {str(e)}")
+    except RateLimited as e:
+        raise rate_limited(e)
+    except PoolTimeout as e:
+        raise pool_busy(e)
+    except BufferFull as e:
+        raise HTTPException(status_code=503, detail=f"Error: {str(e)}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def encode_cursor(last_id: int) -> str:
+    """Cursor opaco para paginación por clave (keyset)"""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor_value: str) -> int:
+    try:
+        padded = cursor_value + "=" * (-len(cursor_value) % 4)
+        prefix, last_id = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        if prefix != "id":
+            raise ValueError(prefix)
+        return int(last_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor 'after' inválido")
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Campos pedidos en ?fields=id,hecho_es (todos si no se indica)"""
+    if not fields:
+        return tuple(LIST_FIELDS)
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in LIST_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no soportados: {', '.join(unknown) or '(vacío)'} (usa {', '.join(LIST_FIELDS)})"
+        )
+    return requested
+
 @app.get("/api/hechos")
-def list_all_facts(limit: int = 100, offset: int = 0):
-    """Lista todos los hechos guardados"""
+def list_all_facts(
+    limit: int = 100,
+    offset: int = 0,
+    after: Optional[str] = None,
+    with_total: bool = True,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    conn=Depends(get_db),
+):
+    """Lista todos los hechos guardados.
+
+    Con `after` (cursor devuelto en `next_cursor`) se pagina por clave sobre
+    `id`, sin el coste creciente de OFFSET en páginas profundas. Con `fields`
+    (p. ej. `id,hecho_es`) solo se leen y devuelven esas columnas.
+    """
+    limit = max(1, min(limit, LIST_MAX_LIMIT))
+    after_id = decode_cursor(after) if after else None
+    selected = parse_fields(fields)
+    columns = tuple(LIST_FIELDS[f] for f in selected if LIST_FIELDS[f] in LIST_COLUMNS)
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM CatFacts")
-            total = cursor.fetchone()[0]
-            
-            cursor.execute(
-                """
-                SELECT id, fact_en, fact_es 
-                FROM CatFacts 
-                ORDER BY id DESC 
-                OFFSET ? ROWS 
-                FETCH NEXT ? ROWS ONLY
-                """,
-                offset, limit
+        # La versión se lee antes que los datos: un ETag nunca es más nuevo que su contenido
+        etag = list_etag(repository.table_version(conn), limit, offset, after_id, with_total, selected)
+        headers = {"ETag": etag, "Cache-Control": cache_control(HTTP_CACHE_MAX_AGE)}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        total = repository.count(conn) if with_total else None
+        
+        if after_id is not None:
+            rows = repository.list_after(conn, limit, after_id, columns)
+        else:
+            rows = repository.list_page(conn, limit, offset, columns)
+        
+        # Cada fila es (id, *columns); el id siempre se lee para el cursor
+        names = ("id",) + tuple(f for f in selected if f != "id")
+        keep_id = "id" in selected
+        return FastJSONResponse({
+            "total": total,
+            "limit": limit,
+            "offset": offset if after_id is None else None,
+            "next_cursor": encode_cursor(rows[-1][0]) if len(rows) == limit else None,
+            "hechos": [
+                dict(zip(names, r)) if keep_id else dict(zip(names[1:], r[1:])) for r in rows
+            ]
+        }, headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+def export_rows(conn, export_format: str, since_id: int):
+    """Genera el volcado por bloques con fetchmany: la memoria no depende del tamaño de la tabla"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "fact_en", "fact_es"])
+        yield buffer.getvalue()
+    for rows in repository.iter_since(conn, since_id, EXPORT_BATCH_SIZE):
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows((r[0], r[1], r[2]) for r in rows)
+            yield buffer.getvalue()
+        else:
+            yield "".join(
+                json.dumps({"id": r[0], "fact_en": r[1], "fact_es": r[2]}, ensure_ascii=False) + "\n"
+                for r in rows
             )
-            rows = cursor.fetchall()
-            
-            return {
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "hechos": [
-                    {
-                        "id": r[0],
-                        "hecho_en": r[1],
-                        "hecho_es": r[2]
-                    } for r in rows
-                ]
-            }
+
+@app.get("/api/hechos/export", dependencies=[Depends(admit("exportacion"))])
+def export_facts(format: str = "ndjson", since_id: int = 0, conn=Depends(get_db)):
+    """Exporta toda la tabla en streaming (NDJSON o CSV).
+
+    `since_id` permite volcados incrementales: solo filas con id mayor. La
+    conexión se pide antes de empezar a responder (503 si el pool está
+    agotado) y se devuelve al terminar el streaming.
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Formato no soportado: usa ndjson o csv")
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_rows(conn, format, since_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="catfacts.{format}"'},
+    )
+
+def encode_search_cursor(corpus: CorpusStats, score: float, last_id: int) -> str:
+    """Cursor opaco de la búsqueda: cifras del corpus con las que se puntuó y
+    (puntuación, id) del último resultado"""
+    frequencies = ".".join(str(df) for df in corpus.frequencies)
+    raw = f"rank:{corpus.documents}:{corpus.total_length}:{frequencies}:{score!r}:{last_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_search_cursor(cursor_value: str) -> Tuple[CorpusStats, Tuple[float, int]]:
+    try:
+        padded = cursor_value + "=" * (-len(cursor_value) % 4)
+        prefix, documents, total_length, frequencies, score, last_id = (
+            base64.urlsafe_b64decode(padded).decode().split(":", 5)
+        )
+        if prefix != "rank":
+            raise ValueError(prefix)
+        corpus = CorpusStats(int(documents), int(total_length), tuple(int(df) for df in frequencies.split(".")))
+        return corpus, (float(score), int(last_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor 'after' inválido")
+
+def load_facts(fact_ids: List[int]) -> dict:
+    with db_pool.connection() as conn:
+        return repository.get_many(conn, fact_ids)
+
+@app.get("/api/hechos/search")
+def search_facts(q: str, lang: str = "en", limit: int = 20, after: Optional[str] = None):
+    """Busca hechos por palabras en inglés (`lang=en`) o en español (`lang=es`).
+
+    Devuelve los que contienen todos los términos ordenados por relevancia
+    (BM25). Con `after` (el `next_cursor` anterior) se pide la página siguiente,
+    puntuada con las mismas cifras del corpus que la primera.
+    """
+    if lang not in LANGUAGES:
+        raise HTTPException(status_code=400, detail="Idioma no soportado: usa en o es")
+    if search_index is None:
+        raise HTTPException(status_code=503, detail="Búsqueda desactivada (SEARCH_INDEX_ENABLED=false)")
+    if not search_index.ready:
+        start_index_build(search_index, load_search_batches, "search-index")
+        raise HTTPException(
+            status_code=503, detail="Índice de búsqueda en construcción", headers={"Retry-After": "5"}
+        )
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    corpus, after_key = decode_search_cursor(after) if after else (None, None)
+    try:
+        total, page, corpus = search_index.search(q, lang, limit, after_key, corpus)
+        rows = load_facts([fact_id for _, fact_id in page]) if page else {}
+        
+        return FastJSONResponse({
+            "q": q,
+            "lang": lang,
+            "total": total,
+            "limit": limit,
+            "next_cursor": encode_search_cursor(corpus, *page[-1]) if len(page) == limit else None,
+            "ranking_parcial": total > search_index.max_candidates,
+            "hechos": [
+                {
+                    "id": fact_id,
+                    "hecho_en": rows[fact_id][1],
+                    "hecho_es": rows[fact_id][2],
+                    "puntuacion": round(score, 4)
+                } for score, fact_id in page if fact_id in rows
+            ]
+        })
+    except PoolTimeout as e:
+        raise pool_busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@app.get("/api/hechos/eventos")
+async def fact_events(last_event_id: Optional[str] = Header(None)):
+    """Flujo Server-Sent Events con las altas, ediciones y borrados.
+
+    Eventos: `alta` y `edicion` ({"hechos": [...]}), `borrado` ({"ids": [...]}),
+    `vaciado` y `recargar` (se perdieron eventos: hay que volver a leer la lista).
+    Al reconectar, el navegador envía Last-Event-ID y recibe lo que se perdió.
+    """
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    stream = change_feed.subscribe(last_id)
+    if stream is None:
+        raise HTTPException(status_code=503, detail="Demasiados clientes conectados", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def fact_dict(row) -> dict:
+    """Cuerpo de CatFactResponse a partir de (id, fact_en, fact_es, row_version, translation_status)"""
+    return {"id": row[0], "fact_en": row[1], "fact_es": row[2], "translation_status": row[4]}
+
+def load_fact(fact_id: int):
+    """Devuelve (hecho como dict, etag) o None si no existe"""
+    with db_pool.connection() as conn:
+        row = repository.get(conn, fact_id)
+    if not row:
+        return None
+    return fact_dict(row), row_etag(row[3])
+
 @app.get("/api/hechos/{fact_id}", response_model=CatFactResponse)
-def get_fact_by_id(fact_id: int):
+def get_fact_by_id(fact_id: int, if_none_match: Optional[str] = Header(None)):
     """Obtener un hecho específico por ID"""
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, fact_en, fact_es FROM CatFacts WHERE id = ?",
-                fact_id
-            )
-            row = cursor.fetchone()
-            
-            if not row:
-                raise HTTPException(status_code=404, detail=f"Hecho con ID {fact_id} no encontrado")
-            
-            return CatFactResponse(id=row[0], fact_en=row[1], fact_es=row[2])
-    
+        cached = fact_cache.get_or_load(fact_id, load_fact)
+        
+        if not cached:
+            raise HTTPException(status_code=404, detail=f"Hecho con ID {fact_id} no encontrado")
+        
+        fact, etag = cached
+        headers = {"ETag": etag, "Cache-Control": cache_control(HTTP_CACHE_MAX_AGE)}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return FastJSONResponse(fact, headers=headers)
+
     except HTTPException:
         raise
+    except PoolTimeout as e:
+        raise pool_busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def apply_update(fact_id: int, cat_fact: CatFactUpdate, if_match: Optional[str]):
+    """UPDATE en una sola sentencia; 404 si no existe y 412 si If-Match no coincide.
+
+    La traducción se hace antes de pedir la conexión, como en las altas, para
+    no retener una conexión del pool mientras responde el traductor.
+    """
+    fact_en = cat_fact.fact_en or None
+    fact_es = cat_fact.fact_es or None
+    versions = if_match_versions(if_match) if if_match else None
+    
+    if fact_en and not fact_es and not translation_worker:
+        fact_es = translate_to_spanish(fact_en)
+    
+    with db_pool.connection() as conn:
+        row = repository.update(conn, fact_id, fact_en, fact_es, versions)
+        exists = bool(row) or (if_match is not None and repository.exists(conn, fact_id))
+    
+    # Con If-Match la precondición se evalúa antes que la existencia: sin
+    # representación actual ni "*" coincide (RFC 9110 §13.1.1) y se responde 412
+    if not row and if_match:
+        detail = "cambió desde la versión indicada en If-Match" if exists else "no existe (If-Match no se cumple)"
+        raise HTTPException(status_code=412, detail=f"El hecho {fact_id} {detail}")
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Hecho con ID {fact_id} no encontrado")
+    
+    fact_cache.invalidate(fact_id)
+    index_fact(row[0], row[1], row[2])
+    publish_facts(UPDATED, [(row[0], row[1], row[2], row[4])])
+    translation_queued(row[4])
+    
+    return FastJSONResponse(fact_dict(row), headers={"ETag": row_etag(row[3])})
+
 @app.put("/api/hechos/{fact_id}", response_model=CatFactResponse)
-def update_cat_fact(fact_id: int, cat_fact: CatFactUpdate):
-    """Actualizar un hecho existente"""
+def update_cat_fact(
+    fact_id: int,
+    cat_fact: CatFactUpdate,
+    if_match: Optional[str] = Header(None),
+):
+    """Actualizar un hecho existente (If-Match opcional)"""
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, fact_en, fact_es FROM CatFacts WHERE id = ?", fact_id)
-            existing = cursor.fetchone()
-            
-            if not existing:
-                raise HTTPException(status_code=404, detail=f"Hecho con ID {fact_id} no encontrado")
-            
-            new_fact_en = cat_fact.fact_en if cat_fact.fact_en else existing[1]
-            new_fact_es = cat_fact.fact_es if cat_fact.fact_es else existing[2]
-            
-            if cat_fact.fact_en and not cat_fact.fact_es:
-                new_fact_es = GoogleTranslator(source="en", target="es").translate(new_fact_en)
-            
-            cursor.execute(
-                "UPDATE CatFacts SET fact_en = ?, fact_es = ? WHERE id = ?",
-                new_fact_en, new_fact_es, fact_id
-            )
-            conn.commit()
-            
-            return CatFactResponse(id=fact_id, fact_en=new_fact_en, fact_es=new_fact_es)
-    
+        return apply_update(fact_id, cat_fact, if_match)
+    except HTTPException:
+        raise
+    except DuplicateFact:
+        raise HTTPException(status_code=409, detail="Ya existe otro hecho con ese texto")
+    except RateLimited as e:
+        raise rate_limited(e)
+    except PoolTimeout as e:
+        raise pool_busy(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.patch("/api/hechos/{fact_id}", response_model=CatFactResponse)
+def patch_cat_fact(
+    fact_id: int,
+    cat_fact: CatFactUpdate,
+    if_match: Optional[str] = Header(None),
+):
+    """Modificar campos de un hecho con concurrencia optimista.
+
+    Exige If-Match con el ETag leído antes (o "*"): si otro cliente lo cambió
+    entretanto, responde 412 en lugar de sobrescribir.
+    """
+    if not if_match:
+        raise HTTPException(status_code=428, detail="PATCH requiere la cabecera If-Match con el ETag del hecho")
+    if not cat_fact.fact_en and not cat_fact.fact_es:
+        raise HTTPException(status_code=400, detail="Nada que modificar: indica fact_en o fact_es")
+    try:
+        return apply_update(fact_id, cat_fact, if_match)
     except HTTPException:
         raise
+    except DuplicateFact:
+        raise HTTPException(status_code=409, detail="Ya existe otro hecho con ese texto")
+    except RateLimited as e:
+        raise rate_limited(e)
+    except PoolTimeout as e:
+        raise pool_busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @app.delete("/api/hechos/{fact_id}")
-def delete_cat_fact(fact_id: int):
+def delete_cat_fact(fact_id: int, conn=Depends(get_db)):
     """Eliminar un hecho por ID"""
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT id FROM CatFacts WHERE id = ?", fact_id)
-            if not cursor.fetchone():
-                raise HTTPException(status_code=404, detail=f"Hecho con ID {fact_id} no encontrado")
-            
-            cursor.execute("DELETE FROM CatFacts WHERE id = ?", fact_id)
-            conn.commit()
-            
-            return {
-                "mensaje": f"Hecho con ID {fact_id} eliminado exitosamente",
-                "id": fact_id
-            }
-    
+        if not repository.delete(conn, fact_id):
+            raise HTTPException(status_code=404, detail=f"Hecho con ID {fact_id} no encontrado")
+        
+        fact_cache.invalidate(fact_id)
+        unindex_fact(fact_id)
+        publish_deleted([fact_id])
+        
+        return {
+            "mensaje": f"Hecho con ID {fact_id} eliminado exitosamente",
+            "id": fact_id
+        }
+
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+# Trabajos en segundo plano (borrado masivo)
+jobs = JobRegistry()
+
+def run_mass_delete(job: Job):
+    """Borra por lotes las filas que existían al lanzar el trabajo.
+
+    Cada lote es una transacción corta, así que las lecturas siguen
+    atendiéndose y el log de transacciones no crece sin límite.
+    """
+    if job.params["truncate"]:
+        with db_pool.connection() as conn:
+            truncated = repository.truncate(conn)
+        if truncated:
+            fact_cache.clear()
+            unindex_all()
+            change_feed.publish(CLEARED, {})
+            job.advance(job.total or 0)
+            job.params["metodo"] = "truncate"
+            return
+    job.params["metodo"] = "lotes"
+
+    with db_pool.connection() as conn:
+        max_id = repository.max_id(conn)
+    if max_id is None:
+        return
+    while True:
+        with db_pool.connection() as conn:
+            ids = repository.delete_chunk(conn, max_id, MASS_DELETE_CHUNK_SIZE)
+        if not ids:
+            break
+        for fact_id in ids:
+            fact_cache.invalidate(fact_id)
+            unindex_fact(fact_id)
+        publish_deleted(ids)
+        job.advance(len(ids))
+        if MASS_DELETE_PAUSE:
+            time.sleep(MASS_DELETE_PAUSE)
+
 @app.delete("/api/hechos")
-def delete_all_facts():
-    """Eliminar todos los hechos"""
+def delete_all_facts(background: bool = False, truncate: bool = False, conn=Depends(get_db)):
+    """Eliminar todos los hechos.
+
+    Con `background=true` se lanza un trabajo que borra por lotes y se
+    responde 202 con su estado (`GET /api/trabajos/{id}`). `truncate=true`
+    usa TRUNCATE TABLE si el motor y los permisos lo permiten.
+    """
+    if background:
+        try:
+            total = repository.count(conn)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+        job = Job("borrado_masivo", total=total, params={"truncate": truncate})
+        running = jobs.submit(job, run_mass_delete, exclusive=True)
+        status_code = 202 if running is job else 409
+        return JSONResponse(
+            status_code=status_code,
+            headers={"Location": f"/api/trabajos/{running.id}"},
+            content={
+                "mensaje": "Borrado masivo en curso" if running is job else "Ya hay un borrado masivo en curso",
+                "trabajo": running.to_dict()
+            },
+        )
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM CatFacts")
-            count = cursor.fetchone()[0]
-            
-            cursor.execute("DELETE FROM CatFacts")
-            conn.commit()
-            
-            return {
-                "mensaje": f"Se eliminaron {count} hechos exitosamente",
-                "total_eliminados": count
-            }
+        count = repository.delete_all(conn)
+        fact_cache.clear()
+        unindex_all()
+        change_feed.publish(CLEARED, {})
+        
+        return {
+            "mensaje": f"Se eliminaron {count} hechos exitosamente",
+            "total_eliminados": count
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/api/trabajos")
+def list_jobs():
+    """Trabajos en segundo plano recientes"""
+    return {"trabajos": [job.to_dict() for job in jobs.list()]}
+
+@app.get("/api/trabajos/{job_id}")
+def get_job(job_id: str):
+    """Estado y progreso de un trabajo en segundo plano"""
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Trabajo {job_id} no encontrado")
+    return job.to_dict()
+
+# ==================== DIAGNÓSTICO ====================
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    """Los perfiles solo se leen con el mismo token que los activa"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Perfilado desactivado (PROFILING_ENABLED=false)")
+    if not profiling_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="X-Profile-Token no válido")
+
+@app.get("/api/perfiles", dependencies=[Depends(require_profiling_token)])
+def list_profiles():
+    """Perfiles de peticiones capturados recientemente"""
+    return {"perfiles": profiles.list()}
+
+@app.get("/api/perfiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+def get_profile(profile_id: str, format: str = "json"):
+    """Un perfil; con `format=collapsed`, pilas colapsadas para flamegraph.pl o speedscope"""
+    profile = profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Perfil {profile_id} no encontrado")
+    if format == "collapsed":
+        return PlainTextResponse("".join(f"{s['pila']} {s['muestras']}\n" for s in profile["pilas"]))
+    return profile
+
+@app.get("/api/lentas")
+def slow_calls(limit: int = 100, x_profile_token: Optional[str] = Header(None)):
+    """Últimas llamadas a SQL, Cat Facts API o traductor por encima del umbral"""
+    if profiling.slow_log is None:
+        raise HTTPException(status_code=404, detail="Log de lentas desactivado (SLOW_LOG_ENABLED=false)")
+    if PROFILING_TOKEN and not profiling_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="X-Profile-Token no válido")
+    return {
+        **profiling.slow_log.stats(),
+        "llamadas": profiling.slow_log.entries(max(1, min(limit, 500))),
+    }
+
+# ==================== ESTADO ====================
+
+@app.get("/api/estado")
+def service_status():
+    """Estadísticas internas para dimensionar el servicio"""
+    return {
+        "motor": repository.name,
+        "pool": db_pool.stats(),
+        "traducciones": translation_cache.stats(),
+        "precarga": prefetcher.stats() if prefetcher else {"activo": False},
+        "catfacts": catfacts_client.stats(),
+        "cache_hechos": fact_cache.stats(),
+        "busqueda": search_index.stats() if search_index else {"activo": False},
+        "aleatorio_local": random_sampler.stats() if random_sampler else {"activo": False},
+        "traduccion_diferida": translation_worker.stats() if translation_worker else {"activo": False},
+        "eventos": change_feed.stats(),
+        "escritura_diferida": insert_buffer.stats() if insert_buffer else {"activo": False},
+        "admision": {
+            "rutas": {name: limiter.stats() for name, limiter in route_limiters.items()},
+            "catfacts": catfacts_client.rate_limiter.stats(),
+            "traductor": translator_bucket.stats(),
+        },
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
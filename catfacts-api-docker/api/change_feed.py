@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import AsyncIterator, Optional
+
+# Tipos de evento
+INSERTED = "alta"
+UPDATED = "edicion"
+DELETED = "borrado"
+CLEARED = "vaciado"
+# El cliente se perdió eventos y debe recargar la lista
+RESYNC = "recargar"
+
+_CLOSED = object()
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event):
+        """Se ejecuta en el event loop del suscriptor"""
+        if self.overflowed and event is not _CLOSED:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: se vacía su cola y se le pide recargar
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(event if event is _CLOSED else None)
+
+
+class ChangeFeed:
+    """Difunde por Server-Sent Events las altas, ediciones y borrados.
+
+    Los endpoints de escritura llaman a `publish` (desde cualquier hilo) y
+    cada cliente conectado recibe el evento en su cola. Se guardan los
+    últimos `history` eventos para que un cliente que se reconecta con
+    Last-Event-ID reciba lo que se perdió; si ya no están, recibe `recargar`.
+    """
+
+    def __init__(self, history: int = 1000, max_subscribers: int = 1000,
+                 queue_size: int = 256, heartbeat: float = 15.0):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._last_id = 0
+
+        self._published = 0
+        self._resyncs = 0
+        self._rejected = 0
+
+    def publish(self, kind: str, data: dict):
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, kind, json.dumps(data, ensure_ascii=False))
+            self._history.append(event)
+            self._published += 1
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.push, event)
+            except RuntimeError:
+                # Event loop cerrado
+                pass
+
+    def close(self):
+        """Termina todas las conexiones abiertas (al apagar la API)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.push, _CLOSED)
+            except RuntimeError:
+                pass
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Optional[AsyncIterator[str]]:
+        """Registra un cliente y devuelve su flujo SSE, o None si se alcanzó el máximo"""
+        subscriber = _Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self._rejected += 1
+                return None
+            self._subscribers.add(subscriber)
+            backlog = self._backlog_locked(last_event_id)
+        return self._stream(subscriber, backlog)
+
+    def _backlog_locked(self, last_event_id: Optional[int]) -> list:
+        if last_event_id is None or last_event_id >= self._last_id:
+            return []
+        oldest = self._history[0][0] if self._history else self._last_id + 1
+        if last_event_id < oldest - 1:
+            return [None]
+        return [event for event in self._history if event[0] > last_event_id]
+
+    async def _stream(self, subscriber: _Subscriber, backlog: list) -> AsyncIterator[str]:
+        try:
+            yield "retry: 3000\nevent: conectado\ndata: {}\n\n"
+            for event in backlog:
+                yield self._format(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": ping\n\n"
+                    continue
+                if event is _CLOSED:
+                    return
+                if event is None:
+                    subscriber.overflowed = False
+                yield self._format(event)
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def _format(self, event) -> str:
+        if event is None:
+            with self._lock:
+                self._resyncs += 1
+                last_id = self._last_id
+            return f"id: {last_id}\nevent: {RESYNC}\ndata: {{}}\n\n"
+        event_id, kind, data = event
+        return f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "suscriptores": len(self._subscribers),
+                "ultimo_evento": self._last_id,
+                "publicados": self._published,
+                "recargas": self._resyncs,
+                "rechazados": self._rejected,
+            }
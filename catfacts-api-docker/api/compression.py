@@ -0,0 +1,85 @@
+import zlib
+
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+
+from http_cache import accepted_encodings
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain")
+
+
+class CompressionMiddleware:
+    """Comprime con zstd o gzip (según Accept-Encoding) las respuestas de la API.
+
+    Solo JSON, CSV y texto, y solo si declaran un Content-Length de al menos
+    `minimum_size` bytes o van en streaming (exportación), que se comprime
+    bloque a bloque. Los eventos SSE y las respuestas que ya traen
+    Content-Encoding (estáticos precomprimidos) pasan tal cual. El ETag de una
+    respuesta comprimida pasa a ser débil: los bytes ya no son los de la
+    representación original.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    def _negotiate(self, scope) -> str:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if "zstd" in accepted:
+            return "zstd"
+        if "gzip" in accepted:
+            return "gzip"
+        return ""
+
+    def _compressor(self, encoding: str):
+        if encoding == "zstd":
+            return zstandard.ZstdCompressor(level=self.zstd_level).compressobj()
+        # wbits=31: formato gzip
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+
+    def _should_compress(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES or "content-encoding" in headers:
+            return False
+        length = headers.get("content-length")
+        return length is None or int(length) >= self.minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._negotiate(scope)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal compressor
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if message["status"] not in (204, 304) and self._should_compress(headers):
+                    compressor = self._compressor(encoding)
+                    headers["Content-Encoding"] = encoding
+                    del headers["Content-Length"]
+                    headers.add_vary_header("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = f"W/{etag}"
+                await send(message)
+                return
+            if message["type"] != "http.response.body" or compressor is None:
+                await send(message)
+                return
+
+            more_body = message.get("more_body", False)
+            body = compressor.compress(message.get("body", b""))
+            if not more_body:
+                body += compressor.flush()
+            if body or not more_body:
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
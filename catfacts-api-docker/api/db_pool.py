@@ -0,0 +1,233 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List
+
+
+class PoolTimeout(Exception):
+    """No se consiguió una conexión libre dentro del tiempo de espera"""
+
+
+class _PooledConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones reutilizables, seguro entre hilos.
+
+    - min_size: conexiones que se abren al arrancar y se mantienen vivas
+    - max_size: límite de conexiones abiertas a la vez
+    - timeout: segundos máximos esperando una conexión libre
+    - recycle: segundos de vida tras los cuales la conexión se reemplaza
+    - ping_after: segundos de inactividad tras los cuales se valida con SELECT 1
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        recycle: float = 1800.0,
+        ping_after: float = 30.0,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Tamaños de pool inválidos")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle: List[_PooledConnection] = []
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Estadísticas
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # ---------- ciclo de vida ----------
+
+    def open(self):
+        """Abre las conexiones mínimas"""
+        for _ in range(self.min_size):
+            item = self._new_connection()
+            with self._lock:
+                self._idle.append(item)
+
+    def close(self):
+        """Cierra todas las conexiones libres y rechaza nuevas peticiones"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._available.notify_all()
+        for item in idle:
+            self._close_quietly(item.conn)
+
+    # ---------- préstamo y devolución ----------
+
+    def acquire(self) -> _PooledConnection:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._lock:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("El pool de conexiones está cerrado")
+                    if self._idle:
+                        item = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reservamos el hueco y conectamos fuera del lock
+                        self._size += 1
+                        item = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"Sin conexiones libres tras {self.timeout}s "
+                            f"({self._in_use}/{self.max_size} en uso)"
+                        )
+                    self._available.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            if item is None:
+                item = self._new_connection(reserved=True)
+            else:
+                item = self._validate(item)
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._size -= 1
+                self._available.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return item
+
+    def release(self, item: _PooledConnection, discard: bool = False):
+        if not discard:
+            try:
+                # Nunca devolvemos al pool una transacción a medias
+                item.conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._lock:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                self._discarded += 1 if discard else 0
+            else:
+                item.last_used = time.monotonic()
+                self._idle.append(item)
+            self._available.notify()
+
+        if discard or self._closed:
+            self._close_quietly(item.conn)
+
+    @contextmanager
+    def connection(self):
+        """Presta una conexión y la devuelve al pool al salir del bloque"""
+        item = self.acquire()
+        try:
+            yield item.conn
+        finally:
+            # release() hace rollback; si falla, la conexión se descarta
+            self.release(item)
+
+    # ---------- estadísticas ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "abiertas": self._size,
+                "en_uso": self._in_use,
+                "libres": len(self._idle),
+                "esperando": self._waiting,
+                "prestamos": self._checkouts,
+                "timeouts": self._timeouts,
+                "creadas": self._created,
+                "recicladas": self._recycled,
+                "descartadas": self._discarded,
+                "espera_media_ms": round(1000 * self._wait_total / self._checkouts, 3) if self._checkouts else 0.0,
+                "espera_max_ms": round(1000 * self._wait_max, 3),
+            }
+
+    # ---------- internos ----------
+
+    def _new_connection(self, reserved: bool = False) -> _PooledConnection:
+        if not reserved:
+            with self._lock:
+                self._size += 1
+        try:
+            conn = self._connect()
+        except Exception:
+            if not reserved:
+                with self._lock:
+                    self._size -= 1
+            raise
+        with self._lock:
+            self._created += 1
+        return _PooledConnection(conn)
+
+    def _validate(self, item: _PooledConnection) -> _PooledConnection:
+        now = time.monotonic()
+        if self.recycle and now - item.created_at > self.recycle:
+            self._close_quietly(item.conn)
+            with self._lock:
+                self._recycled += 1
+            return _PooledConnection(self._reconnect())
+        if now - item.last_used > self.ping_after and not self._is_alive(item.conn):
+            self._close_quietly(item.conn)
+            with self._lock:
+                self._discarded += 1
+            return _PooledConnection(self._reconnect())
+        return item
+
+    def _reconnect(self):
+        conn = self._connect()
+        with self._lock:
+            self._created += 1
+        return conn
+
+    @staticmethod
+    def _is_alive(conn) -> bool:
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
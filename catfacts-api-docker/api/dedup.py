@@ -0,0 +1,61 @@
+import argparse
+
+from repository import DuplicateFact, content_hash
+
+
+def backfill_content_hashes(pool, repository, batch_size: int = 1000) -> dict:
+    """Rellena content_hash en las filas anteriores al índice de contenido.
+
+    Recorre por lotes las filas sin hash en orden de id. De cada grupo de
+    duplicados se conserva la fila que ya tenía hash o, si ninguna, la de
+    menor id; el resto se elimina. Cada lote es una transacción, así que el
+    trabajo puede interrumpirse y relanzarse.
+    """
+    batch_size = max(1, min(batch_size, 2000))
+    after_id = 0
+    hashed = 0
+    removed = 0
+    while True:
+        with pool.connection() as conn:
+            rows = repository.rows_missing_hash(conn, after_id, batch_size)
+            if not rows:
+                break
+
+            ids_by_hash = {}
+            for fact_id, fact_en in rows:
+                if fact_en is not None:
+                    ids_by_hash.setdefault(content_hash(fact_en), []).append(fact_id)
+            stored = repository.find_many_by_hash(conn, list(ids_by_hash))
+
+            hashes = []
+            duplicates = []
+            for fact_hash, ids in ids_by_hash.items():
+                if fact_hash in stored:
+                    duplicates.extend(ids)
+                else:
+                    hashes.append((ids[0], fact_hash))
+                    duplicates.extend(ids[1:])
+
+            try:
+                repository.apply_hash_backfill(conn, hashes, duplicates)
+            except DuplicateFact:
+                # Una inserción concurrente ocupó uno de los hashes: se repite el lote
+                continue
+            hashed += len(hashes)
+            removed += len(duplicates)
+            after_id = rows[-1][0]
+
+    return {"con_hash": hashed, "eliminados": removed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplica CatFacts y rellena content_hash")
+    parser.add_argument("--batch-size", type=int, default=1000, help="filas por transacción")
+    args = parser.parse_args()
+
+    from app import db_pool, repository
+
+    try:
+        print(backfill_content_hashes(db_pool, repository, args.batch_size))
+    finally:
+        db_pool.close()
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from single_flight import SingleFlight
+
+
+class FactCache:
+    """Caché read-through en memoria para lecturas por id.
+
+    - Acotada por tamaño (LRU) y por antigüedad (ttl, segundos).
+    - Los fallos concurrentes de la misma clave se agrupan en una sola carga.
+    - invalidate()/clear() descartan también las cargas en curso, de modo que
+      una lectura que empezó antes de una escritura nunca vuelve a la caché.
+    - Los "no encontrado" (None) no se guardan.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0,
+                 on_coalesced: Optional[Callable[[int], None]] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._flights = SingleFlight(on_coalesced)
+        self._generation = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], object]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+
+        def load():
+            with self._lock:
+                self._misses += 1
+                generation = self._generation
+            value = loader(key)
+            with self._lock:
+                if value is not None and self.max_size > 0 and generation == self._generation:
+                    self._entries[key] = (value, time.monotonic() + self.ttl)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self._evictions += 1
+            return value
+
+        return self._flights.do(key, load)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.pop(key, None)
+        self._flights.forget(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.clear()
+        self._flights.forget_all()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entries),
+                "max_entradas": self.max_size,
+                "ttl_segundos": self.ttl,
+                "aciertos": self._hits,
+                "fallos": self._misses,
+                "agrupadas": self._flights.stats()["agrupadas"],
+                "invalidaciones": self._invalidations,
+                "desalojos": self._evictions,
+            }
@@ -0,0 +1,21 @@
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto en UTF-8"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializada con orjson.
+
+    Los endpoints calientes la devuelven directamente con dicts ya armados,
+    así FastAPI no pasa el contenido por jsonable_encoder ni por la
+    validación del response_model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
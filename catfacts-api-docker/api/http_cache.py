@@ -0,0 +1,67 @@
+import hashlib
+from typing import List, Optional
+
+
+def row_etag(row_version: bytes) -> str:
+    """ETag fuerte a partir de la columna rowversion de una fila"""
+    return f'"r{bytes(row_version).hex()}"'
+
+
+def list_etag(table_version: str, *params) -> str:
+    """ETag fuerte de una página: versión de la tabla + parámetros de la consulta"""
+    digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:16]
+    return f'"t{table_version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110 §13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def if_match_versions(if_match: str) -> Optional[List[bytes]]:
+    """rowversion aceptadas por If-Match (comparación fuerte, RFC 9110 §13.1.1).
+
+    None significa "*" (cualquier versión). Las etiquetas débiles o ajenas se
+    ignoran, así que una lista vacía no coincide con ninguna fila.
+    """
+    if if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith('"r') and tag.endswith('"'):
+            try:
+                versions.append(bytes.fromhex(tag[2:-1]))
+            except ValueError:
+                continue
+    return versions
+
+
+def accepted_encodings(header: str) -> set:
+    """Codificaciones aceptadas en Accept-Encoding (las de q=0 se descartan)"""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def cache_control(max_age: int) -> str:
+    """Cabecera Cache-Control para respuestas que un proxy puede guardar.
+    Con max_age 0 el proxy las guarda pero revalida siempre con el ETag."""
+    if max_age <= 0:
+        return "public, no-cache"
+    return f"public, max-age={max_age}"
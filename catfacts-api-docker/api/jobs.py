@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+# Estados de un trabajo
+QUEUED = "en_cola"
+RUNNING = "en_curso"
+COMPLETED = "completado"
+FAILED = "fallido"
+
+
+class Job:
+    """Trabajo en segundo plano con progreso consultable"""
+
+    def __init__(self, kind: str, total: Optional[int] = None, params: Optional[dict] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = QUEUED
+        self.total = total
+        self.done = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def advance(self, count: int):
+        with self._lock:
+            self.done += count
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            progress = None
+            if self.total:
+                progress = round(min(100.0, 100 * self.done / self.total), 1)
+            elif self.status == COMPLETED:
+                progress = 100.0
+            return {
+                "id": self.id,
+                "tipo": self.kind,
+                "parametros": self.params,
+                "estado": self.status,
+                "total_estimado": self.total,
+                "procesados": self.done,
+                "progreso": progress,
+                "filas_por_segundo": round(self.done / elapsed, 1) if elapsed > 0 else None,
+                "creado": self.created_at,
+                "iniciado": self.started_at,
+                "terminado": self.finished_at,
+                "error": self.error,
+            }
+
+
+class JobRegistry:
+    """Lanza trabajos en hilos propios y conserva los últimos `max_jobs`"""
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, job: Job, run: Callable[[Job], None], exclusive: bool = False) -> Job:
+        """Lanza el trabajo. Con `exclusive`, si ya hay uno del mismo tipo en
+        marcha no se lanza nada y se devuelve ese."""
+        with self._lock:
+            if exclusive:
+                for other in self._jobs.values():
+                    if other.kind == job.kind and not other.finished:
+                        return other
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest.finished:
+                    break
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._execute, args=(job, run), name=f"job-{job.kind}", daemon=True).start()
+        return job
+
+    def _execute(self, job: Job, run: Callable[[Job], None]):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            run(job)
+            job.status = COMPLETED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
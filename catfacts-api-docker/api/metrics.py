@@ -0,0 +1,104 @@
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+
+import profiling
+
+# Latencias en segundos: de 1 ms a 30 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUESTS = Counter(
+    "catfacts_http_requests_total",
+    "Peticiones HTTP atendidas",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "catfacts_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "catfacts_stage_duration_seconds",
+    "Latencia por etapa interna (upstream_fetch, translation, db_connect, db_query)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+COALESCED = Counter(
+    "catfacts_coalesced_total",
+    "Llamadas que esperaron a otra idéntica en curso en lugar de repetirla (translation, fact_read)",
+    ["operation"],
+)
+ERRORS = Counter(
+    "catfacts_errors_total",
+    "Errores por etapa y tipo de excepción",
+    ["stage", "type"],
+)
+
+
+@contextmanager
+def timed(stage: str, detail=None):
+    """Mide un bloque en el histograma de su etapa y cuenta sus errores.
+
+    `detail` (dict o función que lo devuelve) describe la llamada en el log
+    de lentas; solo se evalúa si la llamada supera el umbral.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        ERRORS.labels(stage, type(e).__name__).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.labels(stage).observe(elapsed)
+        profiling.observe_end(stage, elapsed, detail)
+
+
+class TimedCursor:
+    """Envoltorio de cursor DB-API que mide execute/executemany como db_query"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        with timed("db_query", lambda: profiling.sql_shape(args)):
+            self._cursor.execute(*args, **kwargs)
+        return self
+
+    def executemany(self, *args, **kwargs):
+        with timed("db_query", lambda: profiling.sql_shape(args[:1])):
+            self._cursor.executemany(*args, **kwargs)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name == "_cursor":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+
+class TimedConnection:
+    """Envoltorio de conexión cuyos cursores quedan instrumentados"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return TimedCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def timed_connect(connect):
+    """Fábrica de conexiones instrumentada (db_connect + db_query)"""
+    def factory():
+        with timed("db_connect"):
+            conn = connect()
+        return TimedConnection(conn)
+    return factory
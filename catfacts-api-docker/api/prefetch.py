@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+
+class FactPrefetcher:
+    """Mantiene una cola acotada de hechos ya obtenidos y traducidos.
+
+    Una tarea asyncio en segundo plano rellena la cola cuando baja de
+    low_watermark hasta alcanzar high_watermark, a un máximo de refill_rate
+    hechos por segundo. Si la API externa falla, espera con backoff antes de
+    reintentar.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Tuple[str, str]]],
+        max_size: int = 50,
+        low_watermark: int = 10,
+        high_watermark: int = 40,
+        refill_rate: float = 2.0,
+    ):
+        if not 0 <= low_watermark <= high_watermark <= max_size or high_watermark < 1:
+            raise ValueError("Se requiere 0 <= low_watermark <= high_watermark <= max_size y high_watermark >= 1")
+        self._fetch = fetch
+        self.max_size = max_size
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.refill_rate = refill_rate
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._served = 0
+        self._empty = 0
+        self._fetched = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+
+    def start(self):
+        """Arranca la tarea de relleno; debe llamarse dentro del event loop"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def pop(self) -> Optional[Tuple[str, str]]:
+        """Devuelve un hecho (fact_en, fact_es) o None si la cola está vacía"""
+        if self._queue is None:
+            return None
+        try:
+            item = self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            self._empty += 1
+            self._wakeup.set()
+            return None
+        self._served += 1
+        if self._queue.qsize() < self.low_watermark:
+            self._wakeup.set()
+        return item
+
+    def stats(self) -> dict:
+        return {
+            "activo": self._task is not None,
+            "en_cola": self._queue.qsize() if self._queue else 0,
+            "max_cola": self.max_size,
+            "marca_baja": self.low_watermark,
+            "marca_alta": self.high_watermark,
+            "ritmo_relleno": self.refill_rate,
+            "servidos": self._served,
+            "cola_vacia": self._empty,
+            "obtenidos": self._fetched,
+            "errores": self._errors,
+            "ultimo_error": self._last_error,
+        }
+
+    # ---------- tarea de relleno ----------
+
+    async def _run(self):
+        interval = 1.0 / self.refill_rate if self.refill_rate > 0 else 0.0
+        backoff = interval or 0.5
+        while True:
+            if self._queue.qsize() >= self.low_watermark and self._queue.qsize() > 0:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            while self._queue.qsize() < self.high_watermark:
+                started = time.monotonic()
+                try:
+                    item = await self._fetch()
+                except Exception as e:
+                    self._errors += 1
+                    self._last_error = str(e)
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60.0)
+                    continue
+                backoff = interval or 0.5
+                try:
+                    self._queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    break
+                self._fetched += 1
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
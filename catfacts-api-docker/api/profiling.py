@@ -0,0 +1,278 @@
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Union
+from weakref import WeakKeyDictionary
+
+logger = logging.getLogger("catfacts.lentas")
+
+# Traza de la petición en curso (solo existe si el log de lentas o el perfilado están activos)
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("catfacts_trace", default=None)
+
+# Petición a la que pertenece cada tarea del event loop (solo con perfilado)
+_task_traces: "WeakKeyDictionary[asyncio.Task, RequestTrace]" = WeakKeyDictionary()
+
+# Pilas en reposo del event loop (esperando en el selector): no cuentan como muestras
+_IDLE_LEAVES = {("selectors.py", "select")}
+
+
+class SamplingProfiler:
+    """Perfilador por muestreo de los hilos que atienden una petición.
+
+    Un hilo propio lee cada `interval` segundos la pila de los hilos
+    registrados con `attach` y cuenta las pilas colapsadas
+    ("func (fichero:línea);..."), el formato de los flamegraphs.
+    Un hilo del threadpool se registra solo mientras ejecuta código de la
+    petición; del hilo del event loop, compartido con las demás peticiones,
+    solo cuentan las muestras en las que corre una tarea de esta petición.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.trace: Optional["RequestTrace"] = None
+        self._threads = set()
+        self._seen_threads = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._stacks = Counter()
+        self._foreign = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def attach(self, thread_id: int) -> bool:
+        """Registra el hilo; False si ya lo estaba"""
+        if thread_id in self._threads:
+            return False
+        self._threads.add(thread_id)
+        self._seen_threads.add(thread_id)
+        return True
+
+    def detach(self, thread_id: int):
+        self._threads.discard(thread_id)
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """Registra el hilo del event loop (se llama desde él)"""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self.attach(self._loop_thread)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._loop_thread is not None:
+            self.detach(self._loop_thread)
+        total = sum(self._stacks.values())
+        return {
+            "duracion_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "intervalo_ms": self.interval * 1000,
+            "muestras": total,
+            "muestras_ajenas": self._foreign,
+            "hilos": len(self._seen_threads),
+            "pilas": [{"pila": stack, "muestras": count} for stack, count in self._stacks.most_common(200)],
+            "funciones": self._leaf_totals(),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self._threads):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = self._collapse(frame)
+                if not stack:
+                    continue
+                if thread_id == self._loop_thread and not self._loop_runs_own_task():
+                    # El event loop está atendiendo otra petición
+                    self._foreign += 1
+                    continue
+                self._stacks[stack] += 1
+
+    def _loop_runs_own_task(self) -> bool:
+        task = asyncio.current_task(self._loop)
+        return task is not None and _task_traces.get(task) is self.trace
+
+    def _collapse(self, frame) -> Optional[str]:
+        names = []
+        leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+        if leaf in _IDLE_LEAVES:
+            return None
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _leaf_totals(self) -> List[dict]:
+        """Muestras por función en la cima de la pila (tiempo propio)"""
+        leaves = Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [{"funcion": name, "muestras": count} for name, count in leaves.most_common(30)]
+
+
+class RequestTrace:
+    """Datos de la petición en curso para el log de lentas y el perfilado"""
+
+    def __init__(self, method: str, path: str, params: List[str], profiler: Optional[SamplingProfiler] = None):
+        self.method = method
+        self.path = path
+        self.params = params
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.trace = self
+
+
+class SlowLog:
+    """Registro de llamadas lentas (SQL, Cat Facts API, traductor).
+
+    Guarda las últimas `max_entries` por encima de `threshold` segundos y
+    las escribe en el logger `catfacts.lentas`. Nunca guarda valores: de SQL
+    solo la sentencia y los tipos de sus parámetros, de las peticiones solo
+    los nombres de los parámetros.
+    """
+
+    def __init__(self, threshold: float = 0.2, max_entries: int = 500):
+        self.threshold = threshold
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._recorded = 0
+
+    def record(self, stage: str, elapsed: float, detail: Optional[dict], trace: Optional[RequestTrace]):
+        entry = {
+            "momento": time.time(),
+            "etapa": stage,
+            "duracion_ms": round(elapsed * 1000, 2),
+            "ruta": f"{trace.method} {trace.path}" if trace else None,
+            "parametros_peticion": trace.params if trace else None,
+            "detalle": detail,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._recorded += 1
+        logger.warning("%s lenta (%.1f ms) en %s: %s", stage, elapsed * 1000, entry["ruta"], detail)
+
+    def entries(self, limit: int = 100) -> List[dict]:
+        with self._lock:
+            return list(self._entries)[-limit:][::-1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"umbral_ms": self.threshold * 1000, "registradas": self._recorded, "guardadas": len(self._entries)}
+
+
+class ProfileStore:
+    """Últimos perfiles capturados, por id"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> str:
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = {"id": profile_id, **profile}
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [
+                {k: p[k] for k in ("id", "ruta", "estado", "duracion_ms", "muestras", "creado")}
+                for p in reversed(self._profiles.values())
+            ]
+
+
+# Configuración global: None = desactivado (timed() no hace nada más)
+slow_log: Optional[SlowLog] = None
+
+
+def begin_trace(trace: RequestTrace):
+    """Activa la traza en el contexto actual; con perfilado, la tarea en curso
+    y las que cree a partir de ahora quedan asociadas a la petición"""
+    if trace.profiler is not None:
+        loop = asyncio.get_running_loop()
+        if loop.get_task_factory() is None:
+            loop.set_task_factory(_traced_task_factory)
+        _task_traces[asyncio.current_task()] = trace
+    return _current_trace.set(trace)
+
+
+def end_trace(token):
+    trace = _current_trace.get()
+    if trace is not None and trace.profiler is not None:
+        _task_traces.pop(asyncio.current_task(), None)
+    _current_trace.reset(token)
+
+
+def _traced_task_factory(loop, coro, **kwargs):
+    """Fábrica de tareas que hereda la petición de quien crea la tarea"""
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    trace = context.get(_current_trace) if context is not None else _current_trace.get()
+    if trace is not None and trace.profiler is not None:
+        _task_traces[task] = trace
+    return task
+
+
+def traced(func):
+    """Envuelve una función que corre en el threadpool: si la petición se
+    perfila, su hilo se registra durante toda la llamada y se retira al salir"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = _current_trace.get()
+        if trace is None or trace.profiler is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        if not trace.profiler.attach(thread_id):
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            trace.profiler.detach(thread_id)
+
+    return wrapper
+
+
+def observe_end(stage: str, elapsed: float, detail: Union[None, dict, Callable[[], dict]]):
+    """Al terminar una etapa: se registra si supera el umbral del log de lentas"""
+    if slow_log is None or elapsed < slow_log.threshold:
+        return
+    if callable(detail):
+        detail = detail()
+    slow_log.record(stage, elapsed, detail, _current_trace.get())
+
+
+def sql_shape(args: tuple) -> dict:
+    """Sentencia SQL compacta y tipos de sus parámetros (sin valores)"""
+    statement = " ".join(str(args[0]).split()) if args else ""
+    params = args[1:]
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        params = params[0]
+    return {
+        "sql": statement[:500],
+        "parametros": len(params),
+        "tipos": sorted({type(p).__name__ for p in params}),
+    }
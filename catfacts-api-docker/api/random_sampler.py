@@ -0,0 +1,103 @@
+import random
+import threading
+from array import array
+from typing import Callable, Iterable, List, Optional
+
+
+class RandomIdSampler:
+    """Conjunto de ids de CatFacts con muestreo uniforme en O(1).
+
+    Los ids viven en un array compacto y un diccionario guarda la posición de
+    cada uno, así que añadir, quitar (intercambio con el último) y elegir al
+    azar son O(1). Se carga una vez desde la tabla y después lo mantienen al
+    día los endpoints de escritura.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._lock = threading.Lock()
+        self._ids = array("q")
+        self._positions = {}
+        self._random = rng or random.Random()
+
+        self._ready = False
+        self._building = False
+        self._removed_while_building = set()
+        self._last_error: Optional[str] = None
+        self._samples = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, load_batches: Callable[[], Iterable[List[int]]]):
+        """Carga los ids por bloques; las escrituras concurrentes ya se aplican"""
+        with self._lock:
+            if self._ready or self._building:
+                return
+            self._building = True
+            self._removed_while_building = set()
+        try:
+            for ids in load_batches():
+                with self._lock:
+                    for fact_id in ids:
+                        if fact_id not in self._removed_while_building:
+                            self._add_locked(fact_id)
+            with self._lock:
+                self._ready = True
+                self._last_error = None
+        except Exception as e:
+            self._last_error = str(e)
+        finally:
+            with self._lock:
+                self._building = False
+                self._removed_while_building = set()
+
+    def add(self, fact_id: int):
+        with self._lock:
+            self._removed_while_building.discard(fact_id)
+            self._add_locked(fact_id)
+
+    def remove(self, fact_id: int):
+        with self._lock:
+            if self._building:
+                self._removed_while_building.add(fact_id)
+            position = self._positions.pop(fact_id, None)
+            if position is None:
+                return
+            last = self._ids.pop()
+            if last != fact_id:
+                self._ids[position] = last
+                self._positions[last] = position
+
+    def clear(self):
+        with self._lock:
+            if self._building:
+                self._removed_while_building.update(self._positions)
+            self._ids = array("q")
+            self._positions.clear()
+
+    def choice(self) -> Optional[int]:
+        """Un id al azar o None si no hay ninguno"""
+        with self._lock:
+            if not self._ids:
+                return None
+            self._samples += 1
+            return self._ids[self._random.randrange(len(self._ids))]
+
+    def _add_locked(self, fact_id: int):
+        if fact_id not in self._positions:
+            self._positions[fact_id] = len(self._ids)
+            self._ids.append(fact_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "listo": self._ready,
+                "construyendo": self._building,
+                "ids": len(self._ids),
+                "muestras": self._samples,
+                "ultimo_error": self._last_error,
+            }
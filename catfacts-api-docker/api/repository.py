@@ -0,0 +1,883 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+def content_hash(fact_en: str) -> str:
+    """SHA-256 del texto en inglés normalizado (espacios y mayúsculas)"""
+    normalized = " ".join(fact_en.split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# Estados de translation_status
+TRANSLATION_PENDING = "pending"
+TRANSLATION_COMPLETED = "completed"
+TRANSLATION_FAILED = "failed"
+
+# Columnas que GET /api/hechos puede pedir además del id
+LIST_COLUMNS = ("fact_en", "fact_es")
+
+
+class DuplicateFact(Exception):
+    """Ya existe otro hecho con el mismo contenido"""
+
+
+class CatFactsRepository:
+    """Acceso a la tabla CatFacts.
+
+    Todas las operaciones reciben la conexión prestada por el pool. Las
+    escrituras confirman su propia transacción; en SQLite incrementan además
+    en ella la versión de la tabla (TableVersions). Las subclases solo cambian
+    el SQL propio de cada motor.
+
+    Cada hecho guarda el hash de su contenido (content_hash, índice único):
+    las inserciones devuelven la fila existente en lugar de duplicarla.
+
+    Un hecho insertado sin fact_es queda con translation_status 'pending'
+    hasta que el traductor en segundo plano lo complete.
+    """
+
+    name = "base"
+    integrity_errors: tuple = ()
+    # Marcador de un hash en las comparaciones con content_hash
+    hash_param = "?"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    # ---------- lecturas ----------
+
+    def get(self, conn, fact_id: int) -> Optional[tuple]:
+        """(id, fact_en, fact_es, row_version, translation_status) o None"""
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, fact_en, fact_es, row_version, translation_status FROM CatFacts WHERE id = ?",
+            fact_id
+        )
+        return cursor.fetchone()
+
+    def exists(self, conn, fact_id: int) -> bool:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM CatFacts WHERE id = ?", fact_id)
+        return cursor.fetchone() is not None
+
+    def count(self, conn) -> int:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM CatFacts")
+        return cursor.fetchone()[0]
+
+    def get_many(self, conn, fact_ids: List[int]) -> Dict[int, tuple]:
+        """{id: (id, fact_en, fact_es)} en una sola consulta (máx. 2000 ids)"""
+        if not fact_ids:
+            return {}
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" for _ in fact_ids)
+        cursor.execute(
+            f"SELECT id, fact_en, fact_es FROM CatFacts WHERE id IN ({placeholders})",
+            *fact_ids
+        )
+        return {row[0]: (row[0], row[1], row[2]) for row in cursor.fetchall()}
+
+    def find_by_hash(self, conn, fact_hash: str) -> Optional[tuple]:
+        """(id, fact_en, fact_es) del hecho con ese contenido o None"""
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT id, fact_en, fact_es FROM CatFacts WHERE content_hash = {self.hash_param}", fact_hash
+        )
+        return cursor.fetchone()
+
+    def find_many_by_hash(self, conn, hashes: List[str]) -> Dict[str, tuple]:
+        """{hash: (id, fact_en, fact_es)} en una sola consulta (máx. 2000 hashes)"""
+        if not hashes:
+            return {}
+        cursor = conn.cursor()
+        placeholders = ", ".join(self.hash_param for _ in hashes)
+        cursor.execute(
+            f"SELECT content_hash, id, fact_en, fact_es FROM CatFacts WHERE content_hash IN ({placeholders})",
+            *hashes
+        )
+        return {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+
+    def table_version(self, conn) -> str:
+        """Cambia con cada escritura en la tabla: base del ETag del listado"""
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM TableVersions WHERE table_name = 'CatFacts'")
+        row = cursor.fetchone()
+        return str(row[0] if row else 0)
+
+    def list_page(self, conn, limit: int, offset: int, columns: Tuple[str, ...] = LIST_COLUMNS) -> List[tuple]:
+        """Filas (id, *columns) de la página, de la más reciente a la más antigua"""
+        raise NotImplementedError
+
+    def list_after(self, conn, limit: int, after_id: int, columns: Tuple[str, ...] = LIST_COLUMNS) -> List[tuple]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _select_list(columns: Tuple[str, ...]) -> str:
+        """Lista del SELECT: id y solo las columnas pedidas (de LIST_COLUMNS)"""
+        unknown = set(columns) - set(LIST_COLUMNS)
+        if unknown:
+            raise ValueError(f"Columnas no permitidas: {', '.join(sorted(unknown))}")
+        return ", ".join(("id",) + tuple(columns))
+
+    def iter_since(self, conn, since_id: int, batch_size: int) -> Iterator[List[tuple]]:
+        """Bloques de filas (id, fact_en, fact_es) con id > since_id, en orden"""
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, fact_en, fact_es FROM CatFacts WHERE id > ? ORDER BY id",
+            since_id
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def iter_ids(self, conn, batch_size: int) -> Iterator[List[int]]:
+        """Todos los ids, en bloques de batch_size"""
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM CatFacts ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [row[0] for row in rows]
+
+    def rows_missing_hash(self, conn, after_id: int, limit: int) -> List[tuple]:
+        """(id, fact_en) de filas anteriores al índice de contenido, en orden de id"""
+        raise NotImplementedError
+
+    # ---------- escrituras ----------
+
+    def upsert(self, conn, fact_en: str, fact_es: str) -> Tuple[int, str, str, bool]:
+        """Inserta el hecho salvo que su contenido ya exista.
+
+        Devuelve (id, fact_en, fact_es, creado); si ya existía, son los datos
+        guardados y creado es False.
+        """
+        fact_hash = content_hash(fact_en)
+        cursor = conn.cursor()
+        try:
+            new_id = self._insert_if_absent(cursor, fact_en, fact_es, fact_hash)
+        except self.integrity_errors:
+            # Otra petición insertó el mismo contenido entre medias
+            conn.rollback()
+            new_id = None
+        if new_id is not None:
+            self._bump_version(cursor)
+            conn.commit()
+            return new_id, fact_en, fact_es, True
+        conn.commit()
+        existing = self.find_by_hash(conn, fact_hash)
+        if existing is None:
+            raise RuntimeError("El hecho duplicado se eliminó durante la inserción")
+        return existing[0], existing[1], existing[2], False
+
+    def upsert_many(self, conn, rows: List[Tuple[int, str, str]]) -> Dict[int, Tuple[int, bool]]:
+        """Inserta [(indice, fact_en, fact_es), ...] sin duplicar contenidos.
+
+        Devuelve {indice: (id, creado)}; los repetidos dentro del lote o ya
+        guardados apuntan a la fila existente.
+        """
+        first_by_hash = {}
+        for ordinal, fact_en, fact_es in rows:
+            first_by_hash.setdefault(content_hash(fact_en), (ordinal, fact_en, fact_es))
+        unique_rows = [(ordinal, fact_en, fact_es, h) for h, (ordinal, fact_en, fact_es) in first_by_hash.items()]
+
+        cursor = conn.cursor()
+        inserted = self._insert_many_if_absent(cursor, unique_rows)
+        if inserted:
+            self._bump_version(cursor)
+        conn.commit()
+
+        missing = [h for ordinal, _, _, h in unique_rows if ordinal not in inserted]
+        existing = self.find_many_by_hash(conn, missing)
+        result = {}
+        for ordinal, fact_en, _ in rows:
+            fact_hash = content_hash(fact_en)
+            first = first_by_hash[fact_hash][0]
+            if first in inserted:
+                result[ordinal] = (inserted[first], ordinal == first)
+            elif fact_hash in existing:
+                result[ordinal] = (existing[fact_hash][0], False)
+        return result
+
+    def update(
+        self,
+        conn,
+        fact_id: int,
+        fact_en: Optional[str],
+        fact_es: Optional[str],
+        versions: Optional[List[bytes]] = None,
+    ) -> Optional[tuple]:
+        """Actualiza en una sola sentencia los campos que no sean None.
+
+        Un fact_en nuevo sin fact_es deja la traducción pendiente. Con
+        `versions` solo se actualiza si row_version es una de ellas
+        (concurrencia optimista). Devuelve (id, fact_en, fact_es, row_version,
+        translation_status) o None si la fila no existe o su versión no
+        coincide. Lanza DuplicateFact si el nuevo texto ya pertenece a otro hecho.
+        """
+        if fact_es:
+            status = TRANSLATION_COMPLETED
+        elif fact_en:
+            status = TRANSLATION_PENDING
+        else:
+            status = None
+        params = [
+            fact_en, status, fact_es, content_hash(fact_en) if fact_en else None,
+            status, status, status, fact_id,
+        ]
+        condition = ""
+        if versions is not None:
+            condition = f" AND row_version IN ({', '.join('?' for _ in versions)})" if versions else " AND 1 = 0"
+            params.extend(versions)
+        cursor = conn.cursor()
+        try:
+            row = self._update_returning(cursor, condition, params)
+        except self.integrity_errors:
+            conn.rollback()
+            raise DuplicateFact(fact_en)
+        conn.commit()
+        return row
+
+    def delete(self, conn, fact_id: int) -> bool:
+        """Borra en una sola sentencia; False si no existía"""
+        cursor = conn.cursor()
+        deleted = self._delete_returning(cursor, fact_id)
+        conn.commit()
+        return deleted
+
+    def delete_all(self, conn) -> int:
+        """Borra todo y devuelve cuántas filas había"""
+        cursor = conn.cursor()
+        count = self._delete_all(cursor)
+        conn.commit()
+        return count
+
+    def max_id(self, conn) -> Optional[int]:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(id) FROM CatFacts")
+        return cursor.fetchone()[0]
+
+    def delete_chunk(self, conn, max_id: int, limit: int) -> List[int]:
+        """Borra hasta `limit` filas con id <= max_id en su propia transacción.
+
+        Devuelve los ids borrados; una lista vacía indica que no queda nada.
+        """
+        cursor = conn.cursor()
+        ids = self._delete_chunk_returning(cursor, max_id, limit)
+        if ids:
+            self._bump_version(cursor)
+        conn.commit()
+        return ids
+
+    def truncate(self, conn) -> bool:
+        """Vacía la tabla sin registrar cada fila; False si el motor o los permisos no lo permiten"""
+        return False
+
+    def claim_pending_translations(self, conn, limit: int, now: float, lease_until: float) -> List[tuple]:
+        """Reserva hasta `limit` hechos pendientes cuyo reintento ya venció.
+
+        Devuelve [(id, fact_en, intentos), ...]. La reserva es un plazo
+        (translation_retry_at = lease_until): si el proceso muere, la fila
+        vuelve a estar disponible al vencer.
+        """
+        cursor = conn.cursor()
+        rows = self._claim_pending(cursor, limit, now, lease_until)
+        conn.commit()
+        return rows
+
+    def complete_translations(self, conn, rows: List[Tuple[int, str, str]]) -> List[tuple]:
+        """Guarda [(id, hash de fact_en, fact_es), ...] traducidos.
+
+        Solo se aplican a filas aún pendientes cuyo texto no cambió durante la
+        traducción. Devuelve [(id, fact_en, fact_es), ...] de las actualizadas.
+        """
+        cursor = conn.cursor()
+        updated = []
+        for fact_id, fact_hash, fact_es in rows:
+            row = self._complete_returning(cursor, fact_id, fact_hash, fact_es)
+            if row is not None:
+                updated.append(row)
+        if updated:
+            self._bump_version(cursor)
+        conn.commit()
+        return updated
+
+    def fail_translations(self, conn, rows: List[Tuple[int, Optional[float]]]) -> List[tuple]:
+        """Registra un intento fallido por [(id, reintentar_en), ...].
+
+        Con reintentar_en None la traducción pasa a 'failed' definitivamente.
+        Devuelve [(id, fact_en, fact_es), ...] de las filas que pasaron a 'failed'.
+        """
+        cursor = conn.cursor()
+        for fact_id, retry_at in rows:
+            self._fail_one(cursor, fact_id, retry_at)
+        failed_ids = [fact_id for fact_id, retry_at in rows if retry_at is None]
+        failed = []
+        if failed_ids:
+            placeholders = ", ".join("?" for _ in failed_ids)
+            cursor.execute(
+                f"SELECT id, fact_en, fact_es FROM CatFacts WHERE id IN ({placeholders}) AND translation_status = 'failed'",
+                *failed_ids
+            )
+            failed = cursor.fetchall()
+        conn.commit()
+        return failed
+
+    def _fail_one(self, cursor, fact_id: int, retry_at: Optional[float]):
+        # ROWVERSION cambia solo con cualquier UPDATE: el ETag de la fila cambia con el estado
+        cursor.execute(
+            """
+            UPDATE CatFacts
+            SET translation_attempts = translation_attempts + 1,
+                translation_retry_at = ?,
+                translation_status = CASE WHEN ? IS NULL THEN 'failed' ELSE translation_status END
+            WHERE id = ? AND translation_status = 'pending'
+            """,
+            retry_at, retry_at, fact_id
+        )
+
+    def defer_translations(self, conn, rows: List[Tuple[int, float]]):
+        """Aplaza [(id, reintentar_en), ...] sin contar un intento (p. ej. sin cupo en el traductor)"""
+        cursor = conn.cursor()
+        for fact_id, retry_at in rows:
+            cursor.execute(
+                "UPDATE CatFacts SET translation_retry_at = ? WHERE id = ? AND translation_status = 'pending'",
+                retry_at, fact_id
+            )
+        conn.commit()
+
+    def apply_hash_backfill(self, conn, hashes: List[Tuple[int, str]], duplicates: List[int]):
+        """Guarda [(id, hash), ...] y elimina los ids duplicados en una transacción"""
+        cursor = conn.cursor()
+        try:
+            for fact_id in duplicates:
+                cursor.execute("DELETE FROM CatFacts WHERE id = ?", fact_id)
+            for fact_id, fact_hash in hashes:
+                cursor.execute("UPDATE CatFacts SET content_hash = ? WHERE id = ?", fact_hash, fact_id)
+        except self.integrity_errors:
+            conn.rollback()
+            raise DuplicateFact("hash ya asignado a otro hecho")
+        if duplicates:
+            self._bump_version(cursor)
+        conn.commit()
+
+    # ---------- internos ----------
+
+    # Parámetros: fact_en, estado, fact_es, content_hash, estado x3, id (+ versiones).
+    # None conserva el valor; un estado nuevo reinicia los reintentos de traducción.
+    _update_set = """
+        fact_en = COALESCE(?, fact_en),
+        fact_es = CASE WHEN ? = 'pending' THEN NULL ELSE COALESCE(?, fact_es) END,
+        content_hash = COALESCE(?, content_hash),
+        translation_status = COALESCE(?, translation_status),
+        translation_attempts = CASE WHEN ? IS NULL THEN translation_attempts ELSE 0 END,
+        translation_retry_at = CASE WHEN ? IS NULL THEN translation_retry_at END
+    """
+
+    def _update_returning(self, cursor, condition: str, params: list) -> Optional[tuple]:
+        raise NotImplementedError
+
+    def _claim_pending(self, cursor, limit: int, now: float, lease_until: float) -> List[tuple]:
+        raise NotImplementedError
+
+    def _delete_chunk_returning(self, cursor, max_id: int, limit: int) -> List[int]:
+        raise NotImplementedError
+
+    def _complete_returning(self, cursor, fact_id: int, fact_hash: str, fact_es: str) -> Optional[tuple]:
+        raise NotImplementedError
+
+    def _delete_returning(self, cursor, fact_id: int) -> bool:
+        cursor.execute("DELETE FROM CatFacts WHERE id = ?", fact_id)
+        deleted = cursor.rowcount > 0
+        if deleted:
+            self._bump_version(cursor)
+        return deleted
+
+    def _delete_all(self, cursor) -> int:
+        cursor.execute("DELETE FROM CatFacts")
+        count = cursor.rowcount
+        self._bump_version(cursor)
+        return count
+
+    def _insert_if_absent(self, cursor, fact_en: str, fact_es: str, fact_hash: str) -> Optional[int]:
+        """id de la fila insertada o None si el contenido ya existía"""
+        raise NotImplementedError
+
+    def _insert_many_if_absent(self, cursor, rows: List[Tuple[int, str, str, str]]) -> Dict[int, int]:
+        """Inserta [(indice, fact_en, fact_es, hash), ...] nuevos; {indice: id}"""
+        raise NotImplementedError
+
+    def _bump_version(self, cursor):
+        """Invalida los ETag de las páginas del listado"""
+        cursor.execute("UPDATE TableVersions SET version = version + 1 WHERE table_name = 'CatFacts'")
+
+
+class SqlServerRepository(CatFactsRepository):
+    """SQL Server vía pyodbc (T-SQL)"""
+
+    name = "sqlserver"
+    # pyodbc envía los str como NVARCHAR: sin CAST, SQL Server convertiría la
+    # columna CHAR(64) (CONVERT_IMPLICIT) y recorrería el índice en lugar de buscar
+    hash_param = "CAST(? AS CHAR(64))"
+
+    @property
+    def integrity_errors(self) -> tuple:
+        import pyodbc
+        return (pyodbc.IntegrityError,)
+
+    def count(self, conn) -> int:
+        """Total leído de los metadatos de particiones (sin escanear la tabla)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT SUM(row_count)
+                FROM sys.dm_db_partition_stats
+                WHERE object_id = OBJECT_ID('CatFacts') AND index_id IN (0, 1)
+                """
+            )
+            total = cursor.fetchone()[0]
+            if total is not None:
+                return int(total)
+        except Exception:
+            # Sin permiso VIEW DATABASE STATE: se recurre al COUNT(*)
+            pass
+        return super().count(conn)
+
+    def table_version(self, conn) -> str:
+        """MAX(row_version), número de filas y MIN_ACTIVE_ROWVERSION().
+
+        Sin fila compartida que actualizar, las escrituras no se esperan unas
+        a otras. Las altas y modificaciones suben MAX(row_version) y los
+        borrados cambian el recuento; MIN_ACTIVE_ROWVERSION() cambia cuando
+        confirma una transacción con una row_version menor que el máximo ya
+        visible, que de otro modo no movería ninguna de las dos cifras.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(row_version), MIN_ACTIVE_ROWVERSION() FROM CatFacts")
+        max_version, min_active = cursor.fetchone()
+        return f"{bytes(max_version or b'').hex()}.{self.count(conn)}.{bytes(min_active).hex()}"
+
+    def list_page(self, conn, limit: int, offset: int, columns: Tuple[str, ...] = LIST_COLUMNS) -> List[tuple]:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT {self._select_list(columns)}
+            FROM CatFacts
+            ORDER BY id DESC
+            OFFSET ? ROWS
+            FETCH NEXT ? ROWS ONLY
+            """,
+            offset, limit
+        )
+        return cursor.fetchall()
+
+    def list_after(self, conn, limit: int, after_id: int, columns: Tuple[str, ...] = LIST_COLUMNS) -> List[tuple]:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT TOP (?) {self._select_list(columns)}
+            FROM CatFacts
+            WHERE id < ?
+            ORDER BY id DESC
+            """,
+            limit, after_id
+        )
+        return cursor.fetchall()
+
+    def _bump_version(self, cursor):
+        """La versión del listado sale de row_version (table_version): nada que incrementar"""
+
+    def _update_returning(self, cursor, condition: str, params: list) -> Optional[tuple]:
+        cursor.execute(
+            f"""
+            UPDATE CatFacts SET {self._update_set}
+            OUTPUT INSERTED.id, INSERTED.fact_en, INSERTED.fact_es, INSERTED.row_version, INSERTED.translation_status
+            WHERE id = ?{condition}
+            """,
+            *params
+        )
+        return cursor.fetchone()
+
+    def _delete_returning(self, cursor, fact_id: int) -> bool:
+        cursor.execute("DELETE FROM CatFacts OUTPUT DELETED.id WHERE id = ?", fact_id)
+        return cursor.fetchone() is not None
+
+    def _delete_all(self, cursor) -> int:
+        cursor.execute(
+            """
+            SET NOCOUNT ON;
+            DECLARE @deleted INT;
+            DELETE FROM CatFacts;
+            SET @deleted = @@ROWCOUNT;
+            SET NOCOUNT OFF;
+            SELECT @deleted;
+            """
+        )
+        count = cursor.fetchone()[0]
+        self._drain(cursor)
+        return count
+
+    def _claim_pending(self, cursor, limit: int, now: float, lease_until: float) -> List[tuple]:
+        # READPAST: varias instancias reservan lotes distintos sin esperarse
+        cursor.execute(
+            """
+            UPDATE TOP (?) CatFacts WITH (ROWLOCK, UPDLOCK, READPAST)
+            SET translation_retry_at = ?
+            OUTPUT INSERTED.id, INSERTED.fact_en, INSERTED.translation_attempts
+            WHERE translation_status = 'pending'
+              AND (translation_retry_at IS NULL OR translation_retry_at <= ?)
+            """,
+            limit, lease_until, now
+        )
+        return cursor.fetchall()
+
+    def _complete_returning(self, cursor, fact_id: int, fact_hash: str, fact_es: str) -> Optional[tuple]:
+        cursor.execute(
+            """
+            UPDATE CatFacts
+            SET fact_es = ?, translation_status = 'completed', translation_retry_at = NULL
+            OUTPUT INSERTED.id, INSERTED.fact_en, INSERTED.fact_es
+            WHERE id = ? AND content_hash = CAST(? AS CHAR(64)) AND translation_status = 'pending'
+            """,
+            fact_es, fact_id, fact_hash
+        )
+        return cursor.fetchone()
+
+    def _delete_chunk_returning(self, cursor, max_id: int, limit: int) -> List[int]:
+        # Lotes por debajo de 5000 filas: SQL Server no escala a bloqueo de tabla
+        cursor.execute(
+            """
+            DELETE FROM CatFacts
+            OUTPUT DELETED.id
+            WHERE id IN (SELECT TOP (?) id FROM CatFacts WHERE id <= ? ORDER BY id)
+            """,
+            limit, max_id
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def truncate(self, conn) -> bool:
+        """TRUNCATE TABLE requiere permiso ALTER y reinicia la identidad"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("TRUNCATE TABLE CatFacts")
+        except Exception:
+            conn.rollback()
+            return False
+        self._bump_version(cursor)
+        conn.commit()
+        return True
+
+    @staticmethod
+    def _drain(cursor):
+        """Consume el resto de resultados del lote antes del commit"""
+        while cursor.nextset():
+            pass
+
+    def rows_missing_hash(self, conn, after_id: int, limit: int) -> List[tuple]:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT TOP (?) id, fact_en
+            FROM CatFacts
+            WHERE content_hash IS NULL AND id > ?
+            ORDER BY id
+            """,
+            limit, after_id
+        )
+        return cursor.fetchall()
+
+    def _insert_if_absent(self, cursor, fact_en: str, fact_es: str, fact_hash: str) -> Optional[int]:
+        # UPDLOCK + HOLDLOCK bloquea el rango del hash hasta el commit
+        cursor.execute(
+            """
+            INSERT INTO CatFacts (fact_en, fact_es, content_hash, translation_status)
+            OUTPUT INSERTED.id
+            SELECT ?, ?, ?, CASE WHEN ? IS NULL THEN 'pending' ELSE 'completed' END
+            WHERE NOT EXISTS (
+                SELECT 1 FROM CatFacts WITH (UPDLOCK, HOLDLOCK) WHERE content_hash = CAST(? AS CHAR(64))
+            )
+            """,
+            fact_en, fact_es, fact_hash, fact_es, fact_hash
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _insert_many_if_absent(self, cursor, rows: List[Tuple[int, str, str, str]]) -> Dict[int, int]:
+        """Una sola sentencia: el MERGE emite el índice original junto al id
+        generado, así el orden no depende del servidor"""
+        values = ", ".join("(?, ?, ?, CAST(? AS CHAR(64)))" for _ in rows)
+        params = [value for row in rows for value in row]
+        cursor.execute(
+            f"""
+            MERGE INTO CatFacts WITH (HOLDLOCK) AS t
+            USING (VALUES {values}) AS src (ord, fact_en, fact_es, content_hash)
+            ON t.content_hash = src.content_hash
+            WHEN NOT MATCHED THEN
+                INSERT (fact_en, fact_es, content_hash, translation_status)
+                VALUES (
+                    src.fact_en, src.fact_es, src.content_hash,
+                    CASE WHEN src.fact_es IS NULL THEN 'pending' ELSE 'completed' END
+                )
+            OUTPUT src.ord, INSERTED.id;
+            """,
+            *params
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS CatFacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fact_en TEXT,
+    fact_es TEXT,
+    content_hash TEXT,
+    translation_status TEXT NOT NULL DEFAULT 'completed',
+    translation_attempts INTEGER NOT NULL DEFAULT 0,
+    translation_retry_at REAL,
+    row_version BLOB NOT NULL DEFAULT (randomblob(8))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_CatFacts_content_hash ON CatFacts (content_hash);
+CREATE INDEX IF NOT EXISTS IX_CatFacts_translation_pending
+    ON CatFacts (translation_retry_at) WHERE translation_status = 'pending';
+
+CREATE TABLE IF NOT EXISTS TableVersions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO TableVersions (table_name, version) VALUES ('CatFacts', 0);
+
+CREATE TABLE IF NOT EXISTS TranslationCache (
+    text_hash TEXT PRIMARY KEY,
+    source_lang TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    translated_text TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+# Columnas añadidas después de la primera versión del esquema
+SQLITE_MIGRATIONS = (
+    ("content_hash", "TEXT"),
+    ("translation_status", "TEXT NOT NULL DEFAULT 'completed'"),
+    ("translation_attempts", "INTEGER NOT NULL DEFAULT 0"),
+    ("translation_retry_at", "REAL"),
+)
+
+
+class SqliteRepository(CatFactsRepository):
+    """SQLite embebido. La columna row_version se renueva en cada UPDATE con
+    randomblob(8), equivalente a ROWVERSION de SQL Server para los ETag."""
+
+    name = "sqlite"
+    integrity_errors = (sqlite3.IntegrityError,)
+
+    def _update_returning(self, cursor, condition: str, params: list) -> Optional[tuple]:
+        cursor.execute(
+            f"""
+            UPDATE CatFacts SET {self._update_set}, row_version = randomblob(8)
+            WHERE id = ?{condition}
+            RETURNING id, fact_en, fact_es, row_version, translation_status
+            """,
+            *params
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            self._bump_version(cursor)
+        return row
+
+    def list_page(self, conn, limit: int, offset: int, columns: Tuple[str, ...] = LIST_COLUMNS) -> List[tuple]:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {self._select_list(columns)} FROM CatFacts ORDER BY id DESC LIMIT ? OFFSET ?",
+            limit, offset
+        )
+        return cursor.fetchall()
+
+    def list_after(self, conn, limit: int, after_id: int, columns: Tuple[str, ...] = LIST_COLUMNS) -> List[tuple]:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {self._select_list(columns)} FROM CatFacts WHERE id < ? ORDER BY id DESC LIMIT ?",
+            after_id, limit
+        )
+        return cursor.fetchall()
+
+    def rows_missing_hash(self, conn, after_id: int, limit: int) -> List[tuple]:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, fact_en FROM CatFacts WHERE content_hash IS NULL AND id > ? ORDER BY id LIMIT ?",
+            after_id, limit
+        )
+        return cursor.fetchall()
+
+    _insert_sql = (
+        "INSERT OR IGNORE INTO CatFacts (fact_en, fact_es, content_hash, translation_status) "
+        "VALUES (?1, ?2, ?3, CASE WHEN ?2 IS NULL THEN 'pending' ELSE 'completed' END)"
+    )
+
+    def _claim_pending(self, cursor, limit: int, now: float, lease_until: float) -> List[tuple]:
+        cursor.execute(
+            """
+            UPDATE CatFacts SET translation_retry_at = ?
+            WHERE id IN (
+                SELECT id FROM CatFacts
+                WHERE translation_status = 'pending'
+                  AND (translation_retry_at IS NULL OR translation_retry_at <= ?)
+                ORDER BY id
+                LIMIT ?
+            )
+            RETURNING id, fact_en, translation_attempts
+            """,
+            lease_until, now, limit
+        )
+        return cursor.fetchall()
+
+    def _complete_returning(self, cursor, fact_id: int, fact_hash: str, fact_es: str) -> Optional[tuple]:
+        cursor.execute(
+            """
+            UPDATE CatFacts
+            SET fact_es = ?, translation_status = 'completed', translation_retry_at = NULL,
+                row_version = randomblob(8)
+            WHERE id = ? AND content_hash = ? AND translation_status = 'pending'
+            RETURNING id, fact_en, fact_es
+            """,
+            fact_es, fact_id, fact_hash
+        )
+        return cursor.fetchone()
+
+    def _fail_one(self, cursor, fact_id: int, retry_at: Optional[float]):
+        # Al pasar a 'failed' cambia el cuerpo de GET: nueva versión para su ETag
+        cursor.execute(
+            """
+            UPDATE CatFacts
+            SET translation_attempts = translation_attempts + 1,
+                translation_retry_at = ?,
+                translation_status = CASE WHEN ? IS NULL THEN 'failed' ELSE translation_status END,
+                row_version = CASE WHEN ? IS NULL THEN randomblob(8) ELSE row_version END
+            WHERE id = ? AND translation_status = 'pending'
+            """,
+            retry_at, retry_at, retry_at, fact_id
+        )
+
+    def _delete_chunk_returning(self, cursor, max_id: int, limit: int) -> List[int]:
+        cursor.execute(
+            """
+            DELETE FROM CatFacts
+            WHERE id IN (SELECT id FROM CatFacts WHERE id <= ? ORDER BY id LIMIT ?)
+            RETURNING id
+            """,
+            max_id, limit
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def truncate(self, conn) -> bool:
+        """DELETE sin WHERE: SQLite lo resuelve sin recorrer las filas"""
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM CatFacts")
+        self._bump_version(cursor)
+        conn.commit()
+        return True
+
+    def _insert_if_absent(self, cursor, fact_en: str, fact_es: str, fact_hash: str) -> Optional[int]:
+        cursor.execute(self._insert_sql, fact_en, fact_es, fact_hash)
+        return cursor.lastrowid if cursor.rowcount == 1 else None
+
+    def _insert_many_if_absent(self, cursor, rows: List[Tuple[int, str, str, str]]) -> Dict[int, int]:
+        # En SQLite no hay ida y vuelta por sentencia: basta una transacción
+        ids = {}
+        for ordinal, fact_en, fact_es, fact_hash in rows:
+            cursor.execute(self._insert_sql, fact_en, fact_es, fact_hash)
+            if cursor.rowcount == 1:
+                ids[ordinal] = cursor.lastrowid
+        return ids
+
+
+# ---------- conexiones ----------
+
+class _SqliteCursor:
+    """Adapta sqlite3 al estilo de pyodbc: execute(sql, *params)"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, *params):
+        self._cursor.execute(sql, params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _SqliteConnection:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def cursor(self):
+        return _SqliteCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+# Pragmas por conexión: WAL permite lectores concurrentes con un escritor
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": "5000",
+    "cache_size": "-65536",
+    "temp_store": "MEMORY",
+    "mmap_size": "268435456",
+}
+
+
+def sqlite_connect(path: str, pragmas: Optional[dict] = None) -> Callable[[], object]:
+    """Fábrica de conexiones SQLite; crea el esquema la primera vez"""
+    pragmas = {**SQLITE_PRAGMAS, **(pragmas or {})}
+    schema_lock = threading.Lock()
+    schema_ready = []
+
+    def connect():
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=int(pragmas["busy_timeout"]) / 1000)
+        for pragma, value in pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        with schema_lock:
+            if not schema_ready:
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(CatFacts)")]
+                if columns:
+                    # Base creada con una versión anterior del esquema
+                    for column, ddl in SQLITE_MIGRATIONS:
+                        if column not in columns:
+                            conn.execute(f"ALTER TABLE CatFacts ADD COLUMN {column} {ddl}")
+                conn.executescript(SQLITE_SCHEMA)
+                conn.commit()
+                schema_ready.append(True)
+        return _SqliteConnection(conn)
+
+    return connect
+
+
+def sqlserver_connect(conn_str: str) -> Callable[[], object]:
+    """Fábrica de conexiones pyodbc (se importa solo si se usa SQL Server)"""
+    import pyodbc
+
+    # El pooling del driver ODBC se desactiva para que solo exista nuestro pool
+    pyodbc.pooling = False
+    return lambda: pyodbc.connect(conn_str)
+
+
+BACKENDS = {
+    SqlServerRepository.name: SqlServerRepository,
+    SqliteRepository.name: SqliteRepository,
+}
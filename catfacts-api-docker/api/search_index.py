@@ -0,0 +1,230 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+LANGUAGES = ("en", "es")
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Palabras en minúsculas y sin tildes ("Pequeños" -> "pequenos")"""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _TOKEN.findall(stripped)
+
+
+class CorpusStats(NamedTuple):
+    """Cifras del corpus que usa BM25: documentos, suma de longitudes y
+    documentos con cada término de la consulta (en su orden)"""
+
+    documents: int
+    total_length: int
+    frequencies: Tuple[int, ...]
+
+
+class SearchIndex:
+    """Índice invertido en memoria sobre fact_en y fact_es con ranking BM25.
+
+    Se construye una vez leyendo la tabla por bloques y después lo mantienen
+    al día los endpoints de escritura (add/remove/clear). Las búsquedas piden
+    todos los términos de la consulta y ordenan por (puntuación, id)
+    descendente, lo que permite paginar por clave sobre ese par.
+
+    Las puntuaciones dependen de todo el corpus (número de documentos,
+    longitud media, frecuencia de cada término); `search` devuelve esas
+    cifras y acepta las de la página anterior para que las escrituras entre
+    páginas no muevan el orden de los hechos que no cambiaron.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_candidates: int = 5000):
+        self.k1 = k1
+        self.b = b
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        # idioma -> término -> {id: frecuencia}
+        self._postings = {lang: {} for lang in LANGUAGES}
+        # idioma -> id -> (longitud, términos distintos)
+        self._docs = {lang: {} for lang in LANGUAGES}
+        self._total_length = {lang: 0 for lang in LANGUAGES}
+
+        self._ready = False
+        self._building = False
+        self._removed_while_building = set()
+        self._last_error: Optional[str] = None
+        self._searches = 0
+        self._truncated = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    # ---------- construcción ----------
+
+    def build(self, load_batches: Callable[[], Iterable[List[tuple]]]):
+        """Carga el índice desde filas (id, fact_en, fact_es) por bloques.
+
+        Las escrituras que llegan durante la carga ya se aplican al índice; las
+        filas borradas mientras tanto no se vuelven a añadir.
+        """
+        with self._lock:
+            if self._ready or self._building:
+                return
+            self._building = True
+            self._removed_while_building = set()
+        try:
+            for rows in load_batches():
+                with self._lock:
+                    for fact_id, fact_en, fact_es in rows:
+                        if fact_id not in self._removed_while_building:
+                            self._add_locked(fact_id, fact_en, fact_es)
+            with self._lock:
+                self._ready = True
+                self._last_error = None
+        except Exception as e:
+            self._last_error = str(e)
+        finally:
+            with self._lock:
+                self._building = False
+                self._removed_while_building = set()
+
+    # ---------- mantenimiento ----------
+
+    def add(self, fact_id: int, fact_en: Optional[str], fact_es: Optional[str]):
+        """Indexa (o reindexa) un hecho"""
+        with self._lock:
+            self._removed_while_building.discard(fact_id)
+            self._add_locked(fact_id, fact_en, fact_es)
+
+    def remove(self, fact_id: int):
+        with self._lock:
+            if self._building:
+                self._removed_while_building.add(fact_id)
+            for lang in LANGUAGES:
+                self._remove_locked(lang, fact_id)
+
+    def clear(self):
+        with self._lock:
+            for lang in LANGUAGES:
+                if self._building:
+                    self._removed_while_building.update(self._docs[lang])
+                self._postings[lang].clear()
+                self._docs[lang].clear()
+                self._total_length[lang] = 0
+
+    def _add_locked(self, fact_id: int, fact_en: Optional[str], fact_es: Optional[str]):
+        for lang, text in (("en", fact_en), ("es", fact_es)):
+            self._remove_locked(lang, fact_id)
+            counts = Counter(tokenize(text))
+            if not counts:
+                continue
+            postings = self._postings[lang]
+            for term, tf in counts.items():
+                postings.setdefault(term, {})[fact_id] = tf
+            length = sum(counts.values())
+            self._docs[lang][fact_id] = (length, tuple(counts))
+            self._total_length[lang] += length
+
+    def _remove_locked(self, lang: str, fact_id: int):
+        doc = self._docs[lang].pop(fact_id, None)
+        if doc is None:
+            return
+        length, terms = doc
+        postings = self._postings[lang]
+        for term in terms:
+            ids = postings.get(term)
+            if ids is not None:
+                ids.pop(fact_id, None)
+                if not ids:
+                    del postings[term]
+        self._total_length[lang] -= length
+
+    # ---------- consulta ----------
+
+    def search(
+        self,
+        query: str,
+        lang: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        corpus: Optional[CorpusStats] = None,
+    ) -> Tuple[int, List[Tuple[float, int]], Optional[CorpusStats]]:
+        """Devuelve (coincidencias totales, [(puntuación, id), ...] de la página,
+        cifras del corpus con las que se ha puntuado).
+
+        `after` es el (puntuación, id) del último resultado de la página
+        anterior y `corpus` las cifras que devolvió. Bajo el candado solo se
+        copian las listas de los términos; la intersección y la puntuación se
+        hacen fuera. Con más de `max_candidates` coincidencias solo se puntúan
+        las más recientes (ids mayores).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            self._searches += 1
+            if not terms:
+                return 0, [], None
+            postings = self._postings[lang]
+            lists = [postings.get(term) for term in terms]
+            if any(ids is None for ids in lists):
+                return 0, [], None
+            lists = [dict(ids) for ids in lists]
+            if corpus is None or len(corpus.frequencies) != len(terms):
+                corpus = CorpusStats(
+                    len(self._docs[lang]), self._total_length[lang], tuple(len(ids) for ids in lists)
+                )
+
+        by_size = sorted(lists, key=len)
+        candidates = set(by_size[0])
+        for ids in by_size[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return 0, [], corpus
+        total = len(candidates)
+        if total > self.max_candidates:
+            with self._lock:
+                self._truncated += 1
+            candidates = heapq.nlargest(self.max_candidates, candidates)
+
+        # Lecturas sueltas del diccionario vivo: un hecho borrado entretanto se omite
+        docs = self._docs[lang]
+        n_docs = corpus.documents
+        avg_length = corpus.total_length / n_docs if n_docs else 1.0
+        weights = [
+            (ids, math.log(1 + (n_docs - df + 0.5) / (df + 0.5)))
+            for ids, df in zip(lists, corpus.frequencies)
+        ]
+        k1, b = self.k1, self.b
+
+        scored = []
+        for fact_id in candidates:
+            doc = docs.get(fact_id)
+            if doc is None:
+                continue
+            norm = k1 * (1 - b + b * doc[0] / avg_length)
+            score = 0.0
+            for ids, idf in weights:
+                tf = ids[fact_id]
+                score += idf * tf * (k1 + 1) / (tf + norm)
+            scored.append((score, fact_id))
+
+        if after is not None:
+            scored = [item for item in scored if item < after]
+        return total, heapq.nlargest(limit, scored), corpus
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "listo": self._ready,
+                "construyendo": self._building,
+                "documentos": {lang: len(self._docs[lang]) for lang in LANGUAGES},
+                "terminos": {lang: len(self._postings[lang]) for lang in LANGUAGES},
+                "busquedas": self._searches,
+                "busquedas_recortadas": self._truncated,
+                "max_candidatos": self.max_candidates,
+                "ultimo_error": self._last_error,
+            }
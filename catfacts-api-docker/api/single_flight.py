@@ -0,0 +1,118 @@
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+
+class _Flight:
+    """Llamada en curso de una clave; los demás hilos esperan su resultado"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Agrupa las llamadas concurrentes con la misma clave en una sola.
+
+    El primer hilo que pide una clave (líder) ejecuta la llamada; los que
+    llegan mientras tanto esperan y reciben el mismo resultado o excepción.
+    No guarda nada: en cuanto la llamada termina, la siguiente vuelve a
+    ejecutarse. `on_coalesced(n)` se invoca con las esperas ahorradas.
+    """
+
+    def __init__(self, on_coalesced: Optional[Callable[[int], None]] = None):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._on_coalesced = on_coalesced
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], object]):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+        if not leader:
+            self._notify(1)
+            return self._wait(flight)
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(key, flight)
+        return flight.value
+
+    def do_many(self, keys: Iterable[Hashable], fn_many: Callable[[list], Dict[Hashable, object]]) -> dict:
+        """Como `do` para varias claves: `fn_many` recibe solo las que no están
+        ya en curso y devuelve {clave: valor}; el resto se espera"""
+        leading = {}
+        waiting = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                flight = self._flights.get(key)
+                if flight is None:
+                    leading[key] = self._flights[key] = _Flight()
+                else:
+                    waiting[key] = flight
+            self._leaders += len(leading)
+            self._coalesced += len(waiting)
+        if waiting:
+            self._notify(len(waiting))
+
+        results = {}
+        if leading:
+            try:
+                values = fn_many(list(leading))
+                for key, flight in leading.items():
+                    flight.value = results[key] = values[key]
+            except BaseException as e:
+                for flight in leading.values():
+                    flight.error = e
+                raise
+            finally:
+                for key, flight in leading.items():
+                    self._finish(key, flight)
+        for key, flight in waiting.items():
+            results[key] = self._wait(flight)
+        return results
+
+    def forget(self, key: Hashable):
+        """Las siguientes llamadas con esa clave no se unen a la que está en curso"""
+        with self._lock:
+            self._flights.pop(key, None)
+
+    def forget_all(self):
+        with self._lock:
+            self._flights.clear()
+
+    def _finish(self, key: Hashable, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.done.set()
+
+    @staticmethod
+    def _wait(flight: _Flight):
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _notify(self, count: int):
+        if self._on_coalesced is not None:
+            self._on_coalesced(count)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "en_curso": len(self._flights),
+                "llamadas": self._leaders,
+                "agrupadas": self._coalesced,
+            }
@@ -0,0 +1,297 @@
+let currentEditId = null;
+let events = null;
+let liveUpdates = false;
+let hasMore = false;
+// Hechos por página en GET /api/hechos (ordenados por id descendente)
+const PAGE_SIZE = 100;
+
+// Cargar hechos al iniciar y escuchar los cambios en vivo
+window.onload = function() {
+    loadFacts();
+    subscribeToChanges();
+};
+
+// Mostrar mensaje
+function showMessage(text, type = 'success') {
+    const msg = document.getElementById('message');
+    msg.textContent = text;
+    msg.className = `message ${type} active`;
+    setTimeout(() => {
+        msg.className = 'message';
+    }, 5000);
+}
+
+// Toggle formularios
+function toggleForm(formId) {
+    const form = document.getElementById(formId);
+    form.classList.toggle('active');
+
+    // Limpiar formularios
+    if (formId === 'createForm') {
+        document.getElementById('create_fact_en').value = '';
+        document.getElementById('create_fact_es').value = '';
+    }
+}
+
+// Cargar todos los hechos
+async function loadFacts() {
+    const list = document.getElementById('factsList');
+    list.innerHTML = '<div class="loading">Cargando hechos...</div>';
+
+    try {
+        const response = await fetch(`/api/hechos?limit=${PAGE_SIZE}`);
+        const data = await response.json();
+        hasMore = data.next_cursor !== null;
+
+        list.innerHTML = '';
+        if (data.hechos.length === 0) {
+            showEmptyState();
+            return;
+        }
+        data.hechos.forEach(fact => list.appendChild(renderFact(fact)));
+
+        showMessage(`Se cargaron ${data.total} hechos`, 'success');
+    } catch (error) {
+        list.innerHTML = '<div class="empty-state">Error al cargar los hechos</div>';
+        showMessage('Error al cargar los hechos', 'error');
+    }
+}
+
+function showEmptyState() {
+    document.getElementById('factsList').innerHTML = `
+        <div class="empty-state">
+            <div class="empty-state-icon">😿</div>
+            <p>No hay hechos guardados aún.</p>
+            <p>Haz clic en "Obtener Hecho Aleatorio" o "Crear Hecho Manual"</p>
+        </div>
+    `;
+}
+
+// Tarjeta de un hecho (textContent: el texto nunca se interpreta como HTML)
+function renderFact(fact) {
+    const card = document.createElement('div');
+    card.className = 'fact-card';
+    card.dataset.id = fact.id;
+    card.innerHTML = `
+        <div class="fact-id">ID: ${fact.id}</div>
+        <div class="fact-content">
+            <div class="fact-en"></div>
+            <div class="fact-es"></div>
+        </div>
+        <div class="fact-actions">
+            <button class="btn btn-warning btn-small" onclick="editFact(${fact.id})">
+                Editar
+            </button>
+            <button class="btn btn-danger btn-small" onclick="deleteFact(${fact.id})">
+                Eliminar
+            </button>
+        </div>
+    `;
+    fillFact(card, fact);
+    return card;
+}
+
+function fillFact(card, fact) {
+    const pending = fact.translation_status === 'pending' || fact.translation_status === 'failed';
+    card.querySelector('.fact-en').textContent = `🇬🇧 ${fact.hecho_en}`;
+    card.querySelector('.fact-es').textContent = fact.hecho_es !== null
+        ? `🇪🇸 ${fact.hecho_es}`
+        : `🇪🇸 ${pending ? '(traducción ' + (fact.translation_status === 'failed' ? 'fallida' : 'pendiente') + ')' : ''}`;
+}
+
+function findCard(id) {
+    return document.querySelector(`.fact-card[data-id="${id}"]`);
+}
+
+// ==================== Cambios en vivo (Server-Sent Events) ====================
+
+function subscribeToChanges() {
+    if (!window.EventSource) return;
+    events = new EventSource('/api/hechos/eventos');
+
+    events.addEventListener('conectado', () => { liveUpdates = true; });
+    events.onerror = () => {
+        // EventSource reconecta solo y pide lo perdido con Last-Event-ID
+        liveUpdates = false;
+    };
+
+    events.addEventListener('alta', e => {
+        const list = document.getElementById('factsList');
+        const facts = JSON.parse(e.data).hechos;
+        if (!list.querySelector('.fact-card')) list.innerHTML = '';
+        // Los ids nuevos son los mayores: van al principio de la primera página
+        facts.forEach(fact => {
+            if (!findCard(fact.id)) list.prepend(renderFact(fact));
+        });
+        const cards = list.querySelectorAll('.fact-card');
+        for (let i = cards.length - 1; i >= PAGE_SIZE; i--) {
+            cards[i].remove();
+            hasMore = true;
+        }
+    });
+
+    events.addEventListener('edicion', e => {
+        JSON.parse(e.data).hechos.forEach(fact => {
+            const card = findCard(fact.id);
+            if (card) fillFact(card, fact);
+        });
+    });
+
+    events.addEventListener('borrado', e => {
+        JSON.parse(e.data).ids.forEach(id => {
+            const card = findCard(id);
+            if (card) card.remove();
+        });
+        if (!document.querySelector('.fact-card')) {
+            if (hasMore) loadFacts(); else showEmptyState();
+        }
+    });
+
+    events.addEventListener('vaciado', () => {
+        hasMore = false;
+        showEmptyState();
+    });
+
+    events.addEventListener('recargar', () => loadFacts());
+}
+
+// Sin conexión en vivo se vuelve a leer la lista tras cada cambio
+function refreshIfOffline() {
+    if (!liveUpdates) loadFacts();
+}
+
+// Obtener hecho aleatorio de API externa
+async function getRandomFact() {
+    try {
+        showMessage('Obteniendo hecho aleatorio...', 'success');
+        const response = await fetch('/api/hecho');
+        const data = await response.json();
+        showMessage(`Hecho guardado: "${data.hecho_es}"`, 'success');
+        refreshIfOffline();
+    } catch (error) {
+        showMessage('Error al obtener hecho aleatorio', 'error');
+    }
+}
+
+// Crear hecho manual
+async function createFact() {
+    const fact_en = document.getElementById('create_fact_en').value.trim();
+    const fact_es = document.getElementById('create_fact_es').value.trim();
+
+    if (!fact_en) {
+        showMessage('El hecho en inglés es obligatorio', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/hechos', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({
+                fact_en: fact_en,
+                fact_es: fact_es || null
+            })
+        });
+
+        if (response.ok) {
+            showMessage('Hecho creado exitosamente', 'success');
+            toggleForm('createForm');
+            refreshIfOffline();
+        } else {
+            showMessage('Error al crear el hecho', 'error');
+        }
+    } catch (error) {
+        showMessage('Error de conexión', 'error');
+    }
+}
+
+// Editar hecho
+async function editFact(id) {
+    try {
+        const response = await fetch(`/api/hechos/${id}`);
+        const fact = await response.json();
+
+        currentEditId = id;
+        document.getElementById('edit_id').textContent = id;
+        document.getElementById('edit_fact_en').value = fact.fact_en;
+        document.getElementById('edit_fact_es').value = fact.fact_es;
+
+        document.getElementById('editForm').classList.add('active');
+        document.getElementById('editForm').scrollIntoView({ behavior: 'smooth' });
+    } catch (error) {
+        showMessage('Error al cargar el hecho', 'error');
+    }
+}
+
+// Actualizar hecho
+async function updateFact() {
+    const fact_en = document.getElementById('edit_fact_en').value.trim();
+    const fact_es = document.getElementById('edit_fact_es').value.trim();
+
+    if (!fact_en && !fact_es) {
+        showMessage('Debes proporcionar al menos un campo', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/hechos/${currentEditId}`, {
+            method: 'PUT',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({
+                fact_en: fact_en || null,
+                fact_es: fact_es || null
+            })
+        });
+
+        if (response.ok) {
+            showMessage('Hecho actualizado exitosamente', 'success');
+            toggleForm('editForm');
+            refreshIfOffline();
+        } else {
+            showMessage('Error al actualizar el hecho', 'error');
+        }
+    } catch (error) {
+        showMessage('Error de conexión', 'error');
+    }
+}
+
+// Eliminar hecho
+async function deleteFact(id) {
+    if (!confirm(`¿Estás seguro de eliminar el hecho #${id}?`)) return;
+
+    try {
+        const response = await fetch(`/api/hechos/${id}`, {
+            method: 'DELETE'
+        });
+
+        if (response.ok) {
+            showMessage(`Hecho #${id} eliminado`, 'success');
+            refreshIfOffline();
+        } else {
+            showMessage(' Error al eliminar el hecho', 'error');
+        }
+    } catch (error) {
+        showMessage('Error de conexión', 'error');
+    }
+}
+
+// Eliminar todos
+function confirmDeleteAll() {
+    if (confirm('¿Estás seguro de eliminar TODOS los hechos? Esta acción no se puede deshacer.')) {
+        deleteAll();
+    }
+}
+
+async function deleteAll() {
+    try {
+        const response = await fetch('/api/hechos', {
+            method: 'DELETE'
+        });
+
+        const data = await response.json();
+        showMessage(`${data.mensaje}`, 'success');
+        refreshIfOffline();
+    } catch (error) {
+        showMessage('Error al eliminar los hechos', 'error');
+    }
+}
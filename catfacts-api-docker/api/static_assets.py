@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+
+import brotli
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+
+from http_cache import accepted_encodings
+
+# Recursos que se publican con el hash de su contenido en el nombre
+HASHED_ASSETS = ("app.css", "app.js")
+COMPRESSIBLE = (".html", ".css", ".js")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_with_variants(path: str, data: bytes):
+    """Escribe el fichero y, si es texto, sus variantes .gz y .br"""
+    _write_atomic(path, data)
+    if not path.endswith(COMPRESSIBLE):
+        return
+    _write_atomic(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    _write_atomic(path + ".br", brotli.compress(data, quality=11))
+
+
+def build_static_bundle(source_dir: str, output_dir: str) -> dict:
+    """Genera el bundle de la interfaz web.
+
+    - app.css y app.js se copian como app.<hash>.css / app.<hash>.js
+    - index.html se reescribe para apuntar a los nombres con hash
+    - todos los ficheros de texto se precomprimen (.gz y .br)
+
+    Devuelve el manifiesto {nombre lógico: nombre publicado}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {}
+    for name in HASHED_ASSETS:
+        with open(os.path.join(source_dir, name), "rb") as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        manifest[name] = hashed
+        target = os.path.join(output_dir, hashed)
+        if not os.path.exists(target):
+            _write_with_variants(target, data)
+
+    with open(os.path.join(source_dir, "index.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    for name, hashed in manifest.items():
+        html = html.replace(f"/static/{name}", f"/static/{hashed}")
+    index_path = os.path.join(output_dir, "index.html")
+    data = html.encode("utf-8")
+    # Sin cambios no se reescribe: se conservan Last-Modified y ETag entre reinicios
+    if not os.path.exists(index_path) or open(index_path, "rb").read() != data:
+        _write_with_variants(index_path, data)
+
+    # Se eliminan versiones anteriores de los recursos con hash
+    current = set(manifest.values())
+    for entry in os.listdir(output_dir):
+        base = re.sub(r"\.(gz|br)$", "", entry)
+        if _HASHED_NAME.search(base) and base not in current:
+            try:
+                os.remove(os.path.join(output_dir, entry))
+            except FileNotFoundError:
+                pass
+    return manifest
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles que sirve la variante .br/.gz según Accept-Encoding.
+
+    Los recursos con hash en el nombre llevan caché inmutable de un año; el
+    resto (index.html) se revalida siempre con ETag/Last-Modified. Range,
+    If-Range, If-None-Match e If-Modified-Since los resuelve Starlette.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        path = str(full_path)
+        headers = {"Vary": "Accept-Encoding"}
+        media_type = None
+
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accepted and os.path.isfile(path + suffix):
+                media_type = mimetypes.guess_type(path)[0] or "text/plain"
+                headers["Content-Encoding"] = encoding
+                path += suffix
+                stat_result = os.stat(path)
+                break
+
+        headers["Cache-Control"] = IMMUTABLE_CACHE if _HASHED_NAME.search(str(full_path)) else "no-cache"
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=media_type,
+            headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def rebuild(source_dir: str, output_dir: str) -> dict:
+    """Reconstruye el bundle desde cero (útil en el Dockerfile)"""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return build_static_bundle(source_dir, output_dir)
+
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(rebuild(os.path.join(here, "static"), os.path.join(here, "static_build")))
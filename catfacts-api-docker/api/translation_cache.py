@@ -0,0 +1,265 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from single_flight import SingleFlight
+
+
+def cache_key(text: str, source: str, target: str) -> str:
+    """Hash SHA-256 del texto original y el par de idiomas"""
+    return hashlib.sha256(f"{source}:{target}:{text}".encode("utf-8")).hexdigest()
+
+
+class PartialTranslation(Exception):
+    """El traductor por lotes se detuvo a mitad: `done` traduce los primeros textos"""
+
+    def __init__(self, done: List[str], error: Exception):
+        super().__init__(str(error))
+        self.done = done
+        self.error = error
+
+
+class SqlTranslationStore:
+    """Nivel persistente: tabla TranslationCache en la base de datos.
+
+    `hash_param` es el marcador de text_hash en las comparaciones: en SQL
+    Server "CAST(? AS CHAR(64))" para que busque en la clave primaria.
+    """
+
+    def __init__(self, pool, hash_param: str = "?"):
+        self.pool = pool
+        self.hash_param = hash_param
+
+    def get(self, key: str) -> Optional[str]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT translated_text FROM TranslationCache WHERE text_hash = {self.hash_param}",
+                key
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def get_many(self, keys: List[str]) -> dict:
+        """Consulta varias claves en una sola ida y vuelta (máx. 2000 por llamada)"""
+        if not keys:
+            return {}
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ", ".join(self.hash_param for _ in keys)
+            cursor.execute(
+                f"SELECT text_hash, translated_text FROM TranslationCache WHERE text_hash IN ({placeholders})",
+                *keys
+            )
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def put(self, key: str, source: str, target: str, translated: str):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                INSERT INTO TranslationCache (text_hash, source_lang, target_lang, translated_text)
+                SELECT ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM TranslationCache WHERE text_hash = {self.hash_param})
+                """,
+                key, source, target, translated, key
+            )
+            conn.commit()
+
+
+class TranslationCache:
+    """Caché de traducciones en dos niveles.
+
+    1. LRU en memoria acotada por tamaño (max_size) y antigüedad (ttl, segundos)
+    2. Almacén persistente opcional (store) compartido entre procesos
+
+    Un acierto en cualquiera de los dos niveles evita llamar al traductor.
+    Las traducciones concurrentes del mismo texto comparten una sola llamada.
+    Los fallos del almacén persistente nunca rompen la traducción.
+    """
+
+    def __init__(
+        self,
+        translate: Callable[[str, str, str], str],
+        max_size: int = 10000,
+        ttl: float = 86400.0,
+        store: Optional[SqlTranslationStore] = None,
+        translate_batch: Optional[Callable[[List[str], str, str], List[str]]] = None,
+        on_coalesced: Optional[Callable[[int], None]] = None,
+    ):
+        self._translate = translate
+        self._translate_batch = translate_batch
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._flights = SingleFlight(on_coalesced)
+
+        self._memory_hits = 0
+        self._store_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._store_errors = 0
+
+    def translate(self, text: str, source: str = "en", target: str = "es") -> str:
+        key = cache_key(text, source, target)
+
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached
+        return self._flights.do(key, lambda: self._load(key, text, source, target))
+
+    def translate_many(self, texts: List[str], source: str = "en", target: str = "es") -> List[str]:
+        """Traduce una lista respetando el orden; solo los textos no cacheados
+        (y sin repetir) se envían al traductor, en una sola llamada por lote"""
+        results: List[Optional[str]] = [None] * len(texts)
+        missing = {}
+        for i, text in enumerate(texts):
+            key = cache_key(text, source, target)
+            cached = self._get_memory(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.setdefault(key, (text, []))[1].append(i)
+
+        if missing:
+            texts_by_key = {key: text for key, (text, _) in missing.items()}
+            values = self._flights.do_many(
+                missing, lambda keys: self._load_many(keys, texts_by_key, source, target)
+            )
+            for key, (_, indexes) in missing.items():
+                for i in indexes:
+                    results[i] = values[key]
+        return results
+
+    def cached(self, text: str, source: str = "en", target: str = "es") -> Optional[str]:
+        """Traducción ya guardada (memoria o almacén) sin llamar al traductor"""
+        key = cache_key(text, source, target)
+        value = self._get_memory(key)
+        if value is None and self.store is not None:
+            try:
+                value = self.store.get(key)
+            except Exception:
+                self._count("_store_errors")
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entries),
+                "max_entradas": self.max_size,
+                "ttl_segundos": self.ttl,
+                "aciertos_memoria": self._memory_hits,
+                "aciertos_persistentes": self._store_hits,
+                "fallos": self._misses,
+                "agrupadas": self._flights.stats()["agrupadas"],
+                "desalojos": self._evictions,
+                "expiraciones": self._expirations,
+                "errores_persistencia": self._store_errors,
+            }
+
+    # ---------- internos ----------
+
+    def _load(self, key: str, text: str, source: str, target: str) -> str:
+        """Almacén persistente y, si no está, traductor (una vez por clave en curso)"""
+        if self.store is not None:
+            try:
+                stored = self.store.get(key)
+            except Exception:
+                stored = None
+                self._count("_store_errors")
+            if stored is not None:
+                self._count("_store_hits")
+                self._put_memory(key, stored)
+                return stored
+
+        self._count("_misses")
+        translated = self._translate(text, source, target)
+        self._put_memory(key, translated)
+        self._store(key, source, target, translated)
+        return translated
+
+    def _load_many(self, keys: List[str], texts_by_key: dict, source: str, target: str) -> dict:
+        values = {}
+        if self.store is not None:
+            try:
+                stored = self.store.get_many(keys)
+            except Exception:
+                stored = {}
+                self._count("_store_errors")
+            for key, value in stored.items():
+                self._count("_store_hits")
+                self._put_memory(key, value)
+                values[key] = value
+
+        pending = [key for key in keys if key not in values]
+        if pending:
+            unique = [texts_by_key[key] for key in pending]
+            with self._lock:
+                self._misses += len(unique)
+            try:
+                if self._translate_batch is not None:
+                    translated = self._translate_batch(unique, source, target)
+                else:
+                    translated = []
+                    for text in unique:
+                        translated.append(self._translate(text, source, target))
+            except PartialTranslation as e:
+                # Se conserva lo que sí se tradujo antes de propagar el error
+                self._keep(pending, e.done, source, target, values)
+                raise e.error
+            except Exception as e:
+                if self._translate_batch is None:
+                    self._keep(pending, translated, source, target, values)
+                raise
+            self._keep(pending, translated, source, target, values)
+        return values
+
+    def _keep(self, keys: List[str], translated: List[str], source: str, target: str, values: dict):
+        for key, value in zip(keys, translated):
+            self._put_memory(key, value)
+            self._store(key, source, target, value)
+            values[key] = value
+
+    def _store(self, key: str, source: str, target: str, value: str):
+        if self.store is not None:
+            try:
+                self.store.put(key, source, target, value)
+            except Exception:
+                self._count("_store_errors")
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self._memory_hits += 1
+            return value
+
+    def _put_memory(self, key: str, value: str):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
@@ -0,0 +1,165 @@
+import asyncio
+import random
+import time
+from typing import Callable, List, Optional
+
+from admission import RateLimited
+from repository import content_hash
+
+
+class TranslationWorker:
+    """Traduce en segundo plano los hechos guardados con translation_status 'pending'.
+
+    `workers` tareas asyncio reservan lotes de hasta `batch_size` filas, los
+    traducen en bloque en un hilo y guardan el resultado. Un fallo programa
+    el reintento con backoff exponencial (con jitter); tras `max_attempts`
+    intentos la fila queda en 'failed' y se avisa con `on_failed`. Las filas rechazadas por falta de cupo
+    en el traductor se aplazan sin contar intento. Sin trabajo, cada tarea
+    espera a `notify()` o a `poll_interval` segundos.
+    """
+
+    def __init__(
+        self,
+        pool,
+        repository,
+        translate_many: Callable[[List[str]], List[str]],
+        translate_one: Callable[[str], str],
+        on_translated: Optional[Callable[[List[tuple]], None]] = None,
+        on_failed: Optional[Callable[[List[tuple]], None]] = None,
+        workers: int = 2,
+        batch_size: int = 50,
+        poll_interval: float = 5.0,
+        lease: float = 60.0,
+        max_attempts: int = 5,
+        backoff: float = 10.0,
+    ):
+        if workers < 1 or batch_size < 1:
+            raise ValueError("workers y batch_size deben ser >= 1")
+        self.pool = pool
+        self.repository = repository
+        self._translate_many = translate_many
+        self._translate_one = translate_one
+        self._on_translated = on_translated
+        self._on_failed = on_failed
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self._batches = 0
+        self._translated = 0
+        self._retries = 0
+        self._failed = 0
+        self._deferred = 0
+        self._last_error: Optional[str] = None
+
+    def start(self):
+        """Arranca las tareas; debe llamarse dentro del event loop"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [self._loop.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def notify(self):
+        """Avisa de que hay filas nuevas pendientes (se puede llamar desde hilos)"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await asyncio.to_thread(self.process_batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Base de datos no disponible: se reintenta en el siguiente sondeo
+                self._last_error = str(e)
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def process_batch(self) -> int:
+        """Reserva, traduce y guarda un lote; devuelve cuántas filas reservó"""
+        now = time.time()
+        with self.pool.connection() as conn:
+            claimed = self.repository.claim_pending_translations(conn, self.batch_size, now, now + self.lease)
+        if not claimed:
+            return 0
+        self._batches += 1
+
+        translated = {}
+        errors = {}
+        deferred = {}
+        texts = [fact_en for _, fact_en, _ in claimed]
+        try:
+            translated = dict(zip((fact_id for fact_id, _, _ in claimed), self._translate_many(texts)))
+        except Exception:
+            # Si falla el lote, uno a uno para aislar los errores
+            for fact_id, fact_en, _ in claimed:
+                try:
+                    translated[fact_id] = self._translate_one(fact_en)
+                except RateLimited as e:
+                    deferred[fact_id] = time.time() + e.retry_after * random.uniform(1, 1.5)
+                except Exception as e:
+                    errors[fact_id] = str(e)
+
+        done = [(fact_id, content_hash(fact_en), translated[fact_id])
+                for fact_id, fact_en, _ in claimed if fact_id in translated]
+        failures = []
+        for fact_id, _, attempts in claimed:
+            if fact_id in errors:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    failures.append((fact_id, None))
+                    self._failed += 1
+                else:
+                    delay = self.backoff * 2 ** (attempts - 1)
+                    failures.append((fact_id, time.time() + delay * random.uniform(0.5, 1.5)))
+                    self._retries += 1
+                self._last_error = errors[fact_id]
+
+        with self.pool.connection() as conn:
+            updated = self.repository.complete_translations(conn, done) if done else []
+            failed = self.repository.fail_translations(conn, failures) if failures else []
+            if deferred:
+                self.repository.defer_translations(conn, list(deferred.items()))
+        self._deferred += len(deferred)
+        self._translated += len(updated)
+        if updated and self._on_translated:
+            self._on_translated(updated)
+        if failed and self._on_failed:
+            self._on_failed(failed)
+        return len(claimed)
+
+    def stats(self) -> dict:
+        return {
+            "activo": bool(self._tasks),
+            "trabajadores": self.workers,
+            "lotes": self._batches,
+            "traducidos": self._translated,
+            "reintentos": self._retries,
+            "fallidos": self._failed,
+            "aplazados_sin_cupo": self._deferred,
+            "ultimo_error": self._last_error,
+        }
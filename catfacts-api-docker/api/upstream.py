@@ -0,0 +1,180 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from admission import RateLimited, TokenBucket
+
+
+class UpstreamUnavailable(Exception):
+    """La API externa no está disponible (circuito abierto o reintentos agotados)"""
+
+
+class CircuitBreaker:
+    """Circuit breaker clásico: cerrado -> abierto -> semiabierto.
+
+    Tras failure_threshold fallos consecutivos el circuito se abre y todas las
+    llamadas fallan al instante durante reset_timeout segundos. Después se deja
+    pasar una única llamada de prueba: si va bien se cierra, si falla se reabre.
+    """
+
+    CLOSED = "cerrado"
+    OPEN = "abierto"
+    HALF_OPEN = "semiabierto"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release(self):
+        """La llamada terminó sin resultado (cancelada o sin cupo local): no cuenta
+        como éxito ni como fallo, pero libera la prueba del estado semiabierto"""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class CatFactsClient:
+    """Cliente HTTP asíncrono compartido para la Cat Facts API.
+
+    Reutiliza conexiones (keep-alive), aplica timeouts explícitos, reintenta
+    errores transitorios con backoff exponencial y jitter, y corta el tráfico
+    con un circuit breaker cuando la API externa está caída. Con
+    `rate_limiter` cada intento consume una ficha; sin cupo lanza RateLimited.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_connections: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        self.url = url
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._requests = 0
+        self._retried = 0
+        self._failures = 0
+        self._short_circuited = 0
+        self._rate_limited = 0
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_fact(self) -> str:
+        """Devuelve el texto de un hecho aleatorio en inglés"""
+        # La ficha del primer intento se pide antes de ocupar el circuito semiabierto
+        await self._throttle()
+        await self.start()
+        if not self.breaker.allow():
+            self._short_circuited += 1
+            raise UpstreamUnavailable("Cat Facts API no disponible (circuito abierto)")
+
+        settled = False
+        try:
+            last_error: Optional[Exception] = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self._retried += 1
+                    # Backoff exponencial con jitter completo
+                    await asyncio.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+                    await self._throttle()
+                self._requests += 1
+                try:
+                    response = await self._client.get(self.url)
+                    if response.status_code == 429 or response.status_code >= 500:
+                        last_error = httpx.HTTPStatusError(
+                            f"Respuesta {response.status_code} de la Cat Facts API",
+                            request=response.request,
+                            response=response,
+                        )
+                        continue
+                    response.raise_for_status()
+                    fact = response.json()["fact"]
+                except httpx.TransportError as e:
+                    last_error = e
+                    continue
+                except Exception:
+                    # Errores no transitorios (4xx, JSON inválido): no se reintentan
+                    self._failures += 1
+                    settled = True
+                    self.breaker.record_failure()
+                    raise
+                settled = True
+                self.breaker.record_success()
+                return fact
+
+            self._failures += 1
+            settled = True
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(f"Cat Facts API falló tras {self.retries + 1} intentos: {last_error}")
+        finally:
+            if not settled:
+                # Cancelada o sin cupo local: no dice nada del estado de la API externa
+                self.breaker.release()
+
+    async def _throttle(self):
+        if self.rate_limiter is None:
+            return
+        try:
+            await self.rate_limiter.wait_async()
+        except RateLimited:
+            self._rate_limited += 1
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "circuito": self.breaker.state,
+            "fallos_consecutivos": self.breaker.failures,
+            "peticiones": self._requests,
+            "reintentos": self._retried,
+            "fallos": self._failures,
+            "rechazadas_por_circuito": self._short_circuited,
+            "rechazadas_por_cupo": self._rate_limited,
+        }
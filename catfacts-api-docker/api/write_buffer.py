@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+
+class BufferFull(Exception):
+    """La cola de inserciones pendientes está llena"""
+
+
+class InsertBuffer:
+    """Agrupa las inserciones de hechos en transacciones de varias filas.
+
+    Cada `submit` encola el hecho y devuelve un Future que se resuelve con
+    (id, fact_en, fact_es, creado) cuando su lote se confirma, igual que
+    `repository.upsert`. Un hilo vacía la cola en lotes de hasta
+    `batch_size` filas o cuando el primero lleva `max_delay` segundos
+    esperando, con un solo INSERT multi-fila y un solo commit por lote.
+    `stop()` confirma lo que quede en la cola antes de terminar.
+    """
+
+    def __init__(self, pool, repository, batch_size: int = 100, max_delay: float = 0.005,
+                 max_queue: int = 10000, submit_timeout: float = 1.0):
+        if batch_size < 1:
+            raise ValueError("batch_size debe ser >= 1")
+        self.pool = pool
+        self.repository = repository
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.submit_timeout = submit_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._fallbacks = 0
+        self._rejected = 0
+        self._last_error: Optional[str] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="insert-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """Deja de aceptar inserciones y espera a que se confirme la cola"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        # Lo encolado justo mientras se paraba el hilo
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(leftovers), self.batch_size):
+            self._flush(leftovers[start:start + self.batch_size])
+
+    def submit(self, fact_en: str, fact_es: Optional[str]) -> Future:
+        if self._thread is None or self._stopping.is_set():
+            raise BufferFull("El buffer de inserciones está detenido")
+        future = Future()
+        try:
+            self._queue.put((fact_en, fact_es, future), timeout=self.submit_timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise BufferFull("Demasiadas inserciones pendientes")
+        return future
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: list):
+        rows = [(i, fact_en, fact_es) for i, (fact_en, fact_es, _) in enumerate(batch)]
+        try:
+            with self.pool.connection() as conn:
+                ids = self.repository.upsert_many(conn, rows)
+                existing_ids = [fact_id for fact_id, created in ids.values() if not created]
+                existing = self.repository.get_many(conn, existing_ids) if existing_ids else {}
+        except Exception as e:
+            # Lote fallido: cada fila por separado para no arrastrar a las demás
+            with self._lock:
+                self._fallbacks += 1
+                self._last_error = str(e)
+            self._flush_one_by_one(batch)
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._rows += len(batch)
+        for i, fact_en, fact_es in rows:
+            future = batch[i][2]
+            if i not in ids:
+                future.set_exception(RuntimeError("El hecho duplicado se eliminó durante la inserción"))
+                continue
+            fact_id, created = ids[i]
+            if created:
+                future.set_result((fact_id, fact_en, fact_es, True))
+            elif fact_id in existing:
+                future.set_result((*existing[fact_id], False))
+            else:
+                future.set_exception(RuntimeError("El hecho duplicado se eliminó durante la inserción"))
+
+    def _flush_one_by_one(self, batch: list):
+        for fact_en, fact_es, future in batch:
+            try:
+                with self.pool.connection() as conn:
+                    future.set_result(self.repository.upsert(conn, fact_en, fact_es))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "activo": self._thread is not None,
+                "en_cola": self._queue.qsize(),
+                "lotes": self._batches,
+                "filas": self._rows,
+                "filas_por_lote": round(self._rows / self._batches, 1) if self._batches else None,
+                "lotes_fallidos": self._fallbacks,
+                "rechazadas": self._rejected,
+                "ultimo_error": self._last_error,
+            }
@@ -0,0 +1,51 @@
+"""Dobles locales de las dependencias externas para el benchmark.
+
+- FakeCatFacts: sustituto de catfact.ninja (httpx.MockTransport con latencia)
+- install_fake_translator: GoogleTranslator con latencia configurable
+
+La base de datos es el motor SQLite real de la API (DB_BACKEND=sqlite).
+Nada de esto se usa en producción; solo permite medir la API sin red ni SQL Server.
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+CORPUS = [f"Cats have {n} fun facts worth remembering." for n in range(500)]
+
+
+class FakeCatFacts:
+    """Responde como https://catfact.ninja/fact tras `latency` segundos"""
+
+    def __init__(self, latency: float = 0.05, corpus=CORPUS, seed: int = 42):
+        self.latency = latency
+        self.corpus = corpus
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        fact = self.random.choice(self.corpus)
+        return httpx.Response(200, json={"fact": fact, "length": len(fact)})
+
+    def client(self, **kwargs) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler), **kwargs)
+
+
+def install_fake_translator(latency: float = 0.1):
+    """Reemplaza GoogleTranslator.translate/translate_batch por un stub con latencia"""
+    from deep_translator import GoogleTranslator
+
+    def translate(self, text, **kwargs):
+        time.sleep(latency)
+        return f"[es] {text}"
+
+    def translate_batch(self, batch, **kwargs):
+        time.sleep(latency * len(batch))
+        return [f"[es] {text}" for text in batch]
+
+    GoogleTranslator.translate = translate
+    GoogleTranslator.translate_batch = translate_batch
@@ -0,0 +1,232 @@
+"""Benchmark reproducible de la API con dependencias locales.
+
+Ejecuta la app FastAPI en proceso (ASGI) con el motor SQLite y dobles de
+catfact.ninja y del traductor (ver fakes.py), recorre todas las rutas con la
+concurrencia indicada y guarda RPS y percentiles en JSON para comparar commits.
+
+    python bench/run_bench.py --concurrency 32 --requests 2000
+    python bench/run_bench.py --compare bench/results/<anterior>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(HERE, "..", "api")
+sys.path.insert(0, HERE)
+sys.path.insert(0, API_DIR)
+
+import httpx  # noqa: E402
+
+import fakes  # noqa: E402
+
+SCENARIOS = ("random", "random_local", "create", "read", "update", "delete", "list", "list_cursor")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+async def run_scenario(client, name, make_request, total, concurrency):
+    """Lanza `total` peticiones con `concurrency` trabajadores y mide cada una"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "peticiones": total,
+        "errores": errors,
+        "segundos": round(elapsed, 4),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 3),
+        "p95_ms": round(1000 * percentile(latencies, 95), 3),
+        "p99_ms": round(1000 * percentile(latencies, 99), 3),
+    }
+
+
+def build_requests(seed_ids, delete_ids):
+    rnd = random.Random(7)
+    cursors = []
+
+    async def random_fact(client, i):
+        return await client.get("/api/hecho")
+
+    async def random_local(client, i):
+        return await client.get("/api/hecho", params={"source": "local"})
+
+    async def create(client, i):
+        return await client.post("/api/hechos", json={"fact_en": f"Benchmark fact number {i}."})
+
+    async def read(client, i):
+        return await client.get(f"/api/hechos/{rnd.choice(seed_ids)}")
+
+    async def update(client, i):
+        fact_id = rnd.choice(seed_ids)
+        return await client.put(f"/api/hechos/{fact_id}", json={"fact_es": f"Actualizado {i}"})
+
+    async def delete(client, i):
+        return await client.delete(f"/api/hechos/{delete_ids[i % len(delete_ids)]}")
+
+    async def list_page(client, i):
+        return await client.get("/api/hechos", params={"limit": 50, "offset": rnd.randrange(0, 1000)})
+
+    async def list_cursor(client, i):
+        params = {"limit": 50, "with_total": "false"}
+        if cursors:
+            params["after"] = rnd.choice(cursors)
+        response = await client.get("/api/hechos", params=params)
+        next_cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+        if next_cursor and len(cursors) < 200:
+            cursors.append(next_cursor)
+        return response
+
+    return {
+        "random": random_fact,
+        "random_local": random_local,
+        "create": create,
+        "read": read,
+        "update": update,
+        "delete": delete,
+        "list": list_page,
+        "list_cursor": list_cursor,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True).strip()
+    except Exception:
+        return "desconocido"
+
+
+async def main_async(args):
+    os.environ["DB_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="catfacts-bench-"), "bench.db")
+    # Sin límites por defecto: se mide la API, no los cupos de admisión ni de llamadas salientes
+    os.environ["ADMISSION_ENABLED"] = "true" if args.admission else "false"
+    for name in ("CATFACTS", "TRANSLATOR"):
+        os.environ[f"{name}_RATE"] = str(args.outbound_rate)
+        os.environ[f"{name}_BURST"] = str(args.outbound_rate)
+    fakes.install_fake_translator(args.translator_latency)
+    upstream = fakes.FakeCatFacts(latency=args.upstream_latency)
+
+    import app as api
+
+    api.catfacts_client._client = upstream.client()
+    transport = httpx.ASGITransport(app=api.app)
+
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Datos iniciales
+            seed = [{"fact_en": f"Seed fact {i}", "fact_es": f"Hecho semilla {i}"} for i in range(args.seed_rows)]
+            response = await client.post("/api/hechos/bulk", json=seed)
+            seed_ids = [r["id"] for r in response.json()["resultados"] if "id" in r]
+            delete_ids = seed_ids[-args.requests:]
+            seed_ids = seed_ids[:-len(delete_ids)] or seed_ids
+
+            requests_by_name = build_requests(seed_ids, delete_ids)
+            results = {}
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client, name, requests_by_name[name], args.requests, args.concurrency
+                )
+                print(f"{name:12} {results[name]['rps']:>10.1f} rps  "
+                      f"p50 {results[name]['p50_ms']:>8.2f} ms  "
+                      f"p95 {results[name]['p95_ms']:>8.2f} ms  "
+                      f"p99 {results[name]['p99_ms']:>8.2f} ms  "
+                      f"errores {results[name]['errores']}")
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "concurrencia": args.concurrency,
+            "peticiones_por_escenario": args.requests,
+            "filas_iniciales": args.seed_rows,
+            "latencia_upstream_s": args.upstream_latency,
+            "latencia_traductor_s": args.translator_latency,
+            "control_admision": args.admission,
+            "llamadas_salientes_por_s": args.outbound_rate,
+        },
+        "escenarios": results,
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nComparación con {baseline['meta']['commit']} ({baseline_path})")
+    for name, now in current["escenarios"].items():
+        before = baseline["escenarios"].get(name)
+        if not before:
+            continue
+        rps_delta = 100 * (now["rps"] - before["rps"]) / before["rps"] if before["rps"] else 0.0
+        p99_delta = 100 * (now["p99_ms"] - before["p99_ms"]) / before["p99_ms"] if before["p99_ms"] else 0.0
+        print(f"{name:12} rps {rps_delta:+7.1f}%   p99 {p99_delta:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="peticiones simultáneas")
+    parser.add_argument("--requests", type=int, default=500, help="peticiones por escenario")
+    parser.add_argument("--seed-rows", type=int, default=5000, help="filas cargadas antes de medir")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="latencia del stub de catfact.ninja (s)")
+    parser.add_argument("--translator-latency", type=float, default=0.1, help="latencia del stub del traductor (s)")
+    parser.add_argument("--admission", action="store_true", help="activar los límites por ruta (ADMISSION_ENABLED)")
+    parser.add_argument("--outbound-rate", type=float, default=1e6,
+                        help="cupo de llamadas/s (y ráfaga) a catfact.ninja y al traductor")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="fichero JSON de resultados (por defecto bench/results/<commit>-<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+    if args.seed_rows <= args.requests:
+        parser.error("--seed-rows debe ser mayor que --requests (el escenario delete consume filas)")
+
+    results = asyncio.run(main_async(args))
+
+    output = args.output or os.path.join(
+        HERE, "results", f"{results['meta']['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
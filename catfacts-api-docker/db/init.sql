@@ -7,6 +7,58 @@ GO
 CREATE TABLE CatFacts (
     id INT IDENTITY(1,1) PRIMARY KEY,
     fact_en NVARCHAR(255),
-    fact_es NVARCHAR(255)
+    fact_es NVARCHAR(255),
+    content_hash CHAR(64) NULL,
+    translation_status VARCHAR(10) NOT NULL CONSTRAINT DF_CatFacts_translation_status DEFAULT 'completed',
+    translation_attempts INT NOT NULL CONSTRAINT DF_CatFacts_translation_attempts DEFAULT 0,
+    translation_retry_at FLOAT NULL,
+    row_version ROWVERSION
 );
 GO
+
+-- Hash SHA-256 del texto normalizado: evita guardar (y traducir) hechos repetidos.
+-- Filtrado para admitir filas antiguas sin hash hasta ejecutar dedup.py.
+IF COL_LENGTH('CatFacts', 'content_hash') IS NULL
+    ALTER TABLE CatFacts ADD content_hash CHAR(64) NULL;
+GO
+SET QUOTED_IDENTIFIER ON;  -- sqlcmd lo desactiva y los índices filtrados lo exigen
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_CatFacts_content_hash')
+    CREATE UNIQUE INDEX UX_CatFacts_content_hash
+        ON CatFacts (content_hash)
+        WHERE content_hash IS NOT NULL;
+GO
+
+-- Traducción diferida: 'pending' hasta que el traductor en segundo plano rellena fact_es.
+-- translation_retry_at (epoch en segundos) es el plazo de reserva o del siguiente reintento.
+IF COL_LENGTH('CatFacts', 'translation_status') IS NULL
+    ALTER TABLE CatFacts ADD
+        translation_status VARCHAR(10) NOT NULL CONSTRAINT DF_CatFacts_translation_status DEFAULT 'completed',
+        translation_attempts INT NOT NULL CONSTRAINT DF_CatFacts_translation_attempts DEFAULT 0,
+        translation_retry_at FLOAT NULL;
+GO
+SET QUOTED_IDENTIFIER ON;
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CatFacts_translation_pending')
+    CREATE INDEX IX_CatFacts_translation_pending
+        ON CatFacts (translation_retry_at)
+        WHERE translation_status = 'pending';
+GO
+
+-- Versión de cada fila: ETag de las lecturas por id y condición de If-Match
+IF COL_LENGTH('CatFacts', 'row_version') IS NULL
+    ALTER TABLE CatFacts ADD row_version ROWVERSION;
+GO
+
+-- MAX(row_version) por índice: versión del listado para su ETag
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CatFacts_row_version')
+    CREATE INDEX IX_CatFacts_row_version ON CatFacts (row_version);
+GO
+
+IF OBJECT_ID('TranslationCache', 'U') IS NULL
+    CREATE TABLE TranslationCache (
+        text_hash CHAR(64) PRIMARY KEY,
+        source_lang VARCHAR(10) NOT NULL,
+        target_lang VARCHAR(10) NOT NULL,
+        translated_text NVARCHAR(MAX) NOT NULL,
+        created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+GO
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# La API lee su configuración al importarse: SQLite temporal y traducción diferida
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="catfacts-tests-"), "tests.db")
+os.environ["TRANSLATION_MODE"] = "deferred"
+os.environ["TRANSLATION_MAX_ATTEMPTS"] = "2"
+os.environ["PREFETCH_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+
+@pytest.fixture(scope="session")
+def api():
+    import app
+
+    return app
+
+
+@pytest.fixture
+def client(api):
+    """Cliente sin lifespan: el traductor en segundo plano no arranca y los
+    tests llaman a process_batch cuando lo necesitan"""
+    from fastapi.testclient import TestClient
+
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def published(api, monkeypatch):
+    """Eventos publicados en el flujo de cambios durante el test"""
+    events = []
+    monkeypatch.setattr(api.change_feed, "publish", lambda kind, data: events.append((kind, data)))
+    return events
@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.mark.parametrize("method", ["put", "patch"])
+def test_if_match_star_on_missing_fact_is_412(client, method):
+    response = getattr(client, method)("/api/hechos/999999", json={"fact_es": "x"}, headers={"If-Match": "*"})
+    assert response.status_code == 412
+
+
+def test_put_without_if_match_on_missing_fact_is_404(client):
+    response = client.put("/api/hechos/999999", json={"fact_es": "x"})
+    assert response.status_code == 404
+
+
+def test_if_match_stale_etag_is_412(client):
+    fact = client.post("/api/hechos", json={"fact_en": "Cats purr", "fact_es": "Los gatos ronronean"}).json()
+    etag = client.get(f"/api/hechos/{fact['id']}").headers["ETag"]
+    assert client.patch(f"/api/hechos/{fact['id']}", json={"fact_es": "Ronronean"}, headers={"If-Match": etag}).status_code == 200
+    assert client.patch(f"/api/hechos/{fact['id']}", json={"fact_es": "Otra"}, headers={"If-Match": etag}).status_code == 412
@@ -0,0 +1,31 @@
+from deep_translator import GoogleTranslator
+
+
+def test_failed_translation_changes_etag_and_is_published(api, client, published, monkeypatch):
+    def broken(self, text, **kwargs):
+        raise RuntimeError("traductor caído")
+
+    monkeypatch.setattr(GoogleTranslator, "translate", broken)
+
+    created = client.post("/api/hechos", json={"fact_en": "Cats sleep a lot"}).json()
+    fact_id = created["id"]
+    assert created["translation_status"] == "pending"
+    pending = client.get(f"/api/hechos/{fact_id}")
+    etag = pending.headers["ETag"]
+
+    # Dos intentos (TRANSLATION_MAX_ATTEMPTS=2); el segundo sin esperar el backoff
+    for _ in range(api.translation_worker.max_attempts):
+        with api.db_pool.connection() as conn:
+            conn.cursor().execute("UPDATE CatFacts SET translation_retry_at = NULL WHERE id = ?", fact_id)
+            conn.commit()
+        api.translation_worker.process_batch()
+
+    response = client.get(f"/api/hechos/{fact_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["translation_status"] == "failed"
+    assert response.headers["ETag"] != etag
+
+    updates = [data for kind, data in published if kind == "edicion"]
+    assert updates[-1]["hechos"] == [
+        {"id": fact_id, "hecho_en": "Cats sleep a lot", "hecho_es": None, "translation_status": "failed"}
+    ]